@@ -5,34 +5,58 @@ GREEN='\033[0;32m'
 BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
-echo -e "${GREEN}=== Iniciando Bootstrap de BrainBash ===${NC}"
+# Marca de tiempo para medir cuanto tarda el bootstrap hasta el menu
+BRAINBASH_T0=$(date +%s.%N 2>/dev/null)
+case "$BRAINBASH_T0" in *N*|"") BRAINBASH_T0=$(date +%s) ;; esac
+export BRAINBASH_T0
 
-# 1. Detectar gestor de paquetes e instalar dependencias mínimas (Git + Python)
-echo -e "${GREEN}[+] Verificando dependencias mínimas...${NC}"
+PYZ_URL="https://github.com/Ragdoll-Git/BrainBash/releases/latest/download/brainbash.pyz"
+
+echo -e "${GREEN}=== Iniciando Bootstrap de BrainBash ===${NC}"
 
-if [ -f /etc/debian_version ]; then
-    # Debian / Ubuntu
-    if ! command -v git &> /dev/null || ! command -v python3 &> /dev/null; then
+# 1. Detectar gestor de paquetes e instalar dependencias mínimas
+#    (Python siempre; Git solo si hay que clonar)
+install_deps() {
+    if [ -f /etc/debian_version ]; then
+        # Debian / Ubuntu
         sudo apt-get update -qq
-        sudo apt-get install -y -qq git python3
-    fi
-elif [ -f /etc/alpine-release ]; then
-    # Alpine
-    if ! command -v git &> /dev/null || ! command -v python3 &> /dev/null; then
-        sudo apk add --no-cache git python3
-    fi
-elif [ -f /etc/fedora-release ]; then
-    # Fedora
-    if ! command -v git &> /dev/null || ! command -v python3 &> /dev/null; then
-        sudo dnf install -y git python3
+        sudo apt-get install -y -qq "$@"
+    elif [ -f /etc/alpine-release ]; then
+        # Alpine
+        sudo apk add --no-cache "$@"
+    elif [ -f /etc/fedora-release ]; then
+        # Fedora
+        sudo dnf install -y "$@"
     fi
+}
+
+echo -e "${GREEN}[+] Verificando dependencias mínimas...${NC}"
+if ! command -v python3 &> /dev/null; then
+    install_deps python3
+fi
+
+# 2. Camino rapido: un solo archivo (brainbash.pyz), sin git ni clonado
+PYZ="$HOME/.local/share/brainbash/brainbash.pyz"
+mkdir -p "$(dirname "$PYZ")"
+if command -v curl &> /dev/null && curl -fsSL "$PYZ_URL" -o "$PYZ.part"; then
+    mv "$PYZ.part" "$PYZ"
+    echo -e "${GREEN}[+] Ejecutando instalador (brainbash.pyz)...${NC}"
+    export BRAINBASH_BOOTSTRAP=zipapp
+    python3 "$PYZ" "$@"
+    echo -e "${GREEN}=== BrainBash Finalizado ===${NC}"
+    exit 0
+fi
+rm -f "$PYZ.part"
+
+# 3. Fallback: clonar el repositorio
+echo -e "${BLUE}[i] brainbash.pyz no disponible, clonando el repositorio...${NC}"
+if ! command -v git &> /dev/null; then
+    install_deps git
 fi
 
-# 2. Preparar directorio temporal
 INSTALL_DIR="$HOME/.brainbash-temp"
 rm -rf "$INSTALL_DIR"
 
-# 3. Clonar el repositorio
 echo -e "${GREEN}[+] Clonando BrainBash...${NC}"
 git clone --depth=1 https://github.com/Ragdoll-Git/BrainBash.git "$INSTALL_DIR"
 
@@ -41,6 +65,7 @@ echo -e "${GREEN}[+] Ejecutando instalador Python...${NC}"
 cd "$INSTALL_DIR"
 
 # Pasamos todos los argumentos ($@) al script de python
+export BRAINBASH_BOOTSTRAP=git
 python3 main.py "$@"
 
-echo -e "${GREEN}=== BrainBash Finalizado ===${NC}"
\ No newline at end of file
+echo -e "${GREEN}=== BrainBash Finalizado ===${NC}"
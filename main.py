@@ -9,11 +9,19 @@ import os
 import subprocess
 import time
 import textwrap
+import argparse
+import platform
+import json
+import shutil
 
 from pathlib import Path
-from src.managers import DebianManager, AlpineManager, FedoraManager
 from src.utils import Logger, Colors, TUI
-from src.dotfiles import DotfileManager
+from src.hardware import detect_host, detect_container
+from src.profile import load_profile
+from src import benchmark, runstats
+
+# Lo demas (backend de la distro, red, bundle, dotfiles) se importa recien
+# cuando se usa: hasta el primer menu solo se carga lo minimo.
 
 # ==========================================
 # TEXTOS Y TRADUCCIONES DEL MENU (CONFIG)
@@ -78,6 +86,9 @@ MENU_MODELS = [
     ("phi", "Phi-4 Mini (3.84 B) - Pesado (2.5GB-128K)", "OFF")
 ]
 
+# Dependencias pip de Gemini (se instalan en ~/.gemini-cli/venv)
+GEMINI_PIP_PACKAGES = ["google-generativeai"]
+
 DOTFILES_MAP = {
     "zshrc": ".zshrc",
     "kitty.conf": ".config/kitty/kitty.conf",
@@ -89,34 +100,145 @@ DOTFILES_MAP = {
 # FUNCIONES DE INSTALACION
 # ==========================================
 
+def configure_downloads(profile):
+    """
+    Limite total de ancho de banda para todas las descargas (perfil: downloads.max_kbps,
+    0 = sin limite). Lo usan fetch() y, via Dl-Limit/throttle, apt y dnf.
+    """
+    from src.downloads import SCHEDULER
+    SCHEDULER.configure(profile.get("downloads", {}).get("max_kbps", 0) * 1024)
+    return SCHEDULER
+
 def get_manager():
     try:
         with open("/etc/os-release") as f: data = f.read().lower()
-        if "alpine" in data: return AlpineManager("alpine")
-        if "fedora" in data: return FedoraManager("fedora")
-        if "debian" in data or "ubuntu" in data: return DebianManager("debian")
+        # Solo se importa el backend de esta distro
+        if "alpine" in data:
+            from src.managers.alpine import AlpineManager
+            return AlpineManager("alpine")
+        if "fedora" in data:
+            from src.managers.fedora import FedoraManager
+            return FedoraManager("fedora")
+        if "debian" in data or "ubuntu" in data:
+            from src.managers.debian import DebianManager
+            return DebianManager("debian")
     except: pass
     sys.exit(1)
 
-def install_omz(logger):
-    if (Path.home() / ".oh-my-zsh").exists():
+def install_omz(logger, bundle=None, prefetch=None):
+    omz_dir = Path.home() / ".oh-my-zsh"
+    if omz_dir.exists():
         logger.info("[Skip] Oh My Zsh ya instalado.")
         return
+    if bundle:
+        # Modo offline: sin el tarball en el bundle no hay de donde sacarlo
+        if not bundle.omz_tarball():
+            logger.error("Oh My Zsh no esta en el bundle; se omite (modo offline, sin red).")
+            return
+        logger.info("Instalando Oh My Zsh desde el bundle...")
+        extract_omz(bundle.omz_tarball(), omz_dir)
+        return
+    if prefetch and prefetch.omz_tarball():
+        logger.info("Instalando Oh My Zsh (descargado mientras se usaba el menu)...")
+        extract_omz(prefetch.omz_tarball(), omz_dir)
+        return
+    # Un solo tarball en vez del install.sh (que re-detecta el sistema y hace git clone)
+    from src.bundle import OMZ_TARBALL_URL
+    from src.downloads import fetch
+    import tempfile
     logger.info("Descargando Oh My Zsh...")
-    subprocess.run('sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh)" "" --unattended', 
-                   shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-def setup_ollama(logger, selected_models):
+    temp_dir = Path(tempfile.mkdtemp(prefix="brainbash_dl_"))
+    try:
+        tarball = temp_dir / "ohmyzsh.tar.gz"
+        info = fetch(OMZ_TARBALL_URL, tarball)
+        # La rama master no publica checksum: dejamos registro del sha256 descargado
+        logger.info(f"Oh My Zsh sha256: {info['sha256']}")
+        extract_omz(tarball, omz_dir)
+    except Exception as e:
+        logger.error(f"Fallo la instalacion de Oh My Zsh: {e}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def extract_omz(tarball, omz_dir):
+    """Equivalente a 'install.sh --unattended': copia el repo y crea ~/.zshrc si falta."""
+    import tarfile
+    import tempfile
+    from src.bundle import safe_extractall
+    temp_dir = Path(tempfile.mkdtemp(prefix="brainbash_omz_"))
+    try:
+        with tarfile.open(tarball) as tar:
+            safe_extractall(tar, temp_dir)
+        # El tarball de GitHub trae una carpeta raiz 'ohmyzsh-<rama>/'
+        shutil.move(str(next(temp_dir.iterdir())), str(omz_dir))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    zshrc = Path.home() / ".zshrc"
+    if not zshrc.exists() and not zshrc.is_symlink():
+        shutil.copy(str(omz_dir / "templates" / "zshrc.zsh-template"), str(zshrc))
+
+def download_ollama(logger):
+    """Baja el tarball del motor a ~/.cache/brainbash. None si falla (el script usa curl)."""
+    from src.bundle import OLLAMA_ARCH, OLLAMA_TARBALL_URL
+    from src.downloads import fetch
+    arch = OLLAMA_ARCH.get(platform.machine().lower(), platform.machine().lower())
+    dest = Path.home() / ".cache" / "brainbash" / f"ollama-linux-{arch}.tgz"
+    try:
+        print(f"[Ollama] Descargando motor ({arch})...")
+        fetch(OLLAMA_TARBALL_URL.format(arch=arch), dest)
+        return dest
+    except Exception as e:
+        logger.error(f"No se pudo bajar Ollama ({e}); se usa el instalador con curl.")
+        return None
+
+def download_models(logger, names, models_dir):
+    """
+    Baja los modelos que falten con fetch() (limite de ancho de banda, prioridad baja)
+    y los copia al directorio de Ollama. Si uno falla queda para 'ollama pull'.
+    """
+    from src import ollama_api
+    from src.bundle import copy_models, fetch_model
+    cache = Path.home() / ".cache" / "brainbash" / "models"
+    try:
+        for name in names:
+            if Path(models_dir, ollama_api.manifest_rel_path(name)).exists():
+                continue
+            print(f"[Ollama] Descargando {name}...")
+            try:
+                fetch_model(name, cache)
+            except Exception as e:
+                logger.error(f"No se pudo bajar {name} ({e}); se usa 'ollama pull'.")
+        copy_models(cache, models_dir)
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+def setup_ollama(logger, selected_models, bundle=None, prefetch=None):
     """Instala Ollama SOLO si hay modelos seleccionados"""
     if not selected_models: return
+    from src import modelfile, ollama_api
 
     # 1. Instalar Motor si falta
     if subprocess.run("command -v ollama", shell=True, stdout=subprocess.DEVNULL).returncode != 0:
         logger.step("Instalando Motor Ollama (Requerido para IA local)")
+        if bundle and not bundle.ollama_tarball():
+            logger.error("El motor Ollama no esta en el bundle; se omite la IA local (modo offline, sin red).")
+            return
         try:
             # Intentamos usar el script local si existe
             local_script = Path(__file__).parent / "src" / "scripts" / "install_ollama.sh"
-            if local_script.exists():
+            # Tarball local: del bundle o ya descargado mientras se usaba el menu
+            tarball = bundle.ollama_tarball() if bundle else (prefetch.ollama_tarball() if prefetch else None)
+            downloaded = None
+            if not tarball and not bundle and local_script.exists():
+                # Lo bajamos nosotros (pasa por el limite de ancho de banda) en vez del curl del script
+                tarball = downloaded = download_ollama(logger)
+            if tarball and local_script.exists():
+                print(f"[Ollama] Instalando desde {tarball}")
+                env = dict(os.environ, OLLAMA_BUNDLE=str(tarball))
+                try:
+                    subprocess.run(["sh", str(local_script)], check=True, env=env)
+                finally:
+                    if downloaded: downloaded.unlink()
+            elif local_script.exists():
                 print(f"[Ollama] Usando instalador local: {local_script}")
                 subprocess.run(f"sh {local_script}", shell=True, check=True)
             else:
@@ -167,9 +289,32 @@ def setup_ollama(logger, selected_models):
         except Exception as e:
             logger.error(f"Error leyendo contexto: {e}")
 
+    # 2.5. Plantilla y datos del host para ajustar cada Modelfile
+    template_path = Path(__file__).parent / "config" / "Modelfile"
+    if not template_path.exists():
+        logger.error("No se encontro config/Modelfile")
+        return
+    with open(template_path, "r") as f:
+        template_content = f.read()
+
+    host = detect_host()
+    profile = load_profile()
+    logger.info(f"Host: {host['cores']} nucleos, {host['mem_available_mb']}MB libres")
+
     # 3. Descargar Modelos y crear alias
     logger.info("Verificando servicio IA...")
     time.sleep(2)
+
+    # Modo offline: los modelos vienen en el bundle con el layout de ~/.ollama/models
+    if bundle:
+        logger.info(f"Importando modelos del bundle a {ollama_api.get_models_dir()}...")
+        bundle.import_models(ollama_api.get_models_dir())
+    else:
+        names = [MODELS_MAP[m] for m in selected_models if m in MODELS_MAP]
+        if prefetch:
+            prefetch.import_models(names, ollama_api.get_models_dir())
+        # Lo que falte pasa por el planificador; el 'ollama pull' de abajo solo verifica
+        download_models(logger, names, ollama_api.get_models_dir())
     
     for menu_id in selected_models:
         tag_original = MODELS_MAP.get(menu_id) # qwen3:0.6b
@@ -181,42 +326,47 @@ def setup_ollama(logger, selected_models):
             logger.step(f"IA Local: Configurando {tag_alias}")
             try:
                 # 1. Pull del original
-                logger.info(f"Descargando base: {tag_original}...")
-                subprocess.run(f"ollama pull {tag_original}", shell=True, check=True)
+                present = Path(ollama_api.get_models_dir(), ollama_api.manifest_rel_path(tag_original)).exists()
+                if bundle and bundle.has_model(tag_original):
+                    logger.info(f"Base {tag_original} importada del bundle.")
+                elif bundle:
+                    # Modo offline: sin 'ollama pull'; sirve solo si ya estaba instalado
+                    if not present:
+                        logger.error(f"{tag_original} no esta en el bundle; se omite {tag_alias} (modo offline).")
+                        continue
+                    logger.info(f"Base {tag_original} ya instalada.")
+                else:
+                    # Ya bajado por download_models: el pull solo verifica contra el registry
+                    logger.info(f"{'Verificando' if present else 'Descargando'} base: {tag_original}...")
+                    subprocess.run(f"ollama pull {tag_original}", shell=True, check=True)
                 
-                # 2. Crear Modelfile usando la plantilla
-                if system_prompt:
-                    logger.info(f"Creando {tag_alias} con contexto...")
-                    
-                    template_path = Path(__file__).parent / "config" / "Modelfile"
-                    if not template_path.exists():
-                         logger.error("No se encontro config/Modelfile")
-                         continue
-
-                    with open(template_path, "r") as f:
-                        template_content = f.read()
+                # 2. Crear Modelfile usando la plantilla + parametros del host
+                params = modelfile.tune_parameters(menu_id, host, profile)
+                final_modelfile = modelfile.render_modelfile(template_content, tag_original, params, system_prompt)
+                if menu_id in modelfile.MODEL_SPECS:
+                    mem = modelfile.estimate_memory_mb(menu_id, params)
+                    logger.info(
+                        f"{tag_alias}: " + ", ".join(f"{k}={v}" for k, v in params.items()) +
+                        f" -> ~{mem['total_mb']}MB (pesos {mem['weights_mb']} + KV {mem['kv_mb']} + computo {mem['compute_mb']})"
+                    )
+                    if mem["total_mb"] > host["mem_available_mb"]:
+                        logger.error(f"{tag_alias} puede no entrar en la RAM libre ({host['mem_available_mb']}MB).")
+
+                logger.info(f"Creando {tag_alias}{' con contexto' if system_prompt else ''}...")
+
+                # Escribimos el archivo final temporalmente
+                modelfile_path = "Modelfile.gen"
+                try:
+                    with open(modelfile_path, "w", encoding="utf-8") as f:
+                        f.write(final_modelfile)
                     
-                    # Reemplazamos las variables
-                    final_modelfile = template_content.replace("${BASE_MODEL}", tag_original)
-                    final_modelfile = final_modelfile.replace("${SYSTEM_PROMPT}", system_prompt)
-
-                    # Escribimos el archivo final temporalmente
-                    modelfile_path = "Modelfile.gen"
-                    try:
-                        with open(modelfile_path, "w", encoding="utf-8") as f:
-                            f.write(final_modelfile)
-                        
-                        subprocess.run(
-                            ["ollama", "create", tag_alias, "-f", modelfile_path],
-                            check=True
-                        )
-                    finally:
-                         if os.path.exists(modelfile_path):
-                            os.remove(modelfile_path)
-                else:
-                    # Fallback al viejo "cp" si no hay contexto
-                    logger.info(f"Creando alias (sin contexto): {tag_alias}...")
-                    subprocess.run(f"ollama cp {tag_original} {tag_alias}", shell=True, check=True)
+                    subprocess.run(
+                        ["ollama", "create", tag_alias, "-f", modelfile_path],
+                        check=True
+                    )
+                finally:
+                     if os.path.exists(modelfile_path):
+                        os.remove(modelfile_path)
                 
                 # 3. Crear wrapper (script ejecutable)
                 bin_dir = Path.home() / ".local" / "bin"
@@ -235,11 +385,45 @@ def setup_ollama(logger, selected_models):
             except subprocess.CalledProcessError as e:
                 logger.error(f"Fallo al configurar {tag_alias}: {e}")
 
-def setup_gemini(logger, tui):
-    """Configura Gemini usando el script src/gemini_tool.py"""
-    logger.step("Configurando Gemini (Google AI)")
-    
-    # 0. Preguntar por API Key
+    # 4. Precarga opcional del modelo por defecto al abrir la terminal
+    setup_preload(logger, selected_models, profile)
+
+def setup_preload(logger, selected_models, profile):
+    """Instala brainbash-preload si el perfil lo habilita (ollama.preload.enabled)"""
+    preload_cfg = profile.get("ollama", {}).get("preload", {})
+    config_path = Path.home() / ".config" / "brainbash" / "preload.json"
+
+    if not preload_cfg.get("enabled"):
+        # Sin config el zshrc no lanza nada
+        if config_path.exists():
+            config_path.unlink()
+        return
+
+    menu_id = preload_cfg.get("model") or selected_models[0]
+    if menu_id not in selected_models:
+        logger.error(f"Preload: {menu_id} no esta entre los modelos seleccionados.")
+        return
+
+    logger.info(f"Configurando precarga de {menu_id}-local (keep_alive {preload_cfg.get('keep_alive', '30m')})...")
+    try:
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(config_path, "w") as f:
+            json.dump({"model": f"{menu_id}-local", "keep_alive": preload_cfg.get("keep_alive", "30m")}, f)
+
+        bin_dir = Path.home() / ".local" / "bin"
+        bin_dir.mkdir(parents=True, exist_ok=True)
+        dest_script = bin_dir / "brainbash-preload"
+        with open(Path(__file__).parent / "src" / "preload.py", "r") as f:
+            original_code = f.read()
+        with open(dest_script, "w") as f:
+            f.write("#!/usr/bin/env python3\n" + original_code)
+        dest_script.chmod(0o755)
+        logger.success("Precarga instalada. Estado: 'brainbash-preload status'.")
+    except Exception as e:
+        logger.error(f"Error instalando precarga: {e}")
+
+def ask_gemini_key(logger):
+    """Pide la API Key antes del despliegue para que la instalacion corra sin esperas."""
     print("\n--- Configuracion de API Key ---")
     print("Si tienes una API Key de Google Gemini, ingrésala ahora.")
     print("Si no, presiona Enter para configurar después.")
@@ -256,6 +440,10 @@ def setup_gemini(logger, tui):
             logger.error(f"Error guardando API Key: {e}")
     else:
         logger.info("Saltando configuración de Key. Recuerda agregarla manualmente luego en ~/.zshrc.")
+
+def setup_gemini(logger, tui, bundle=None, prefetch=None):
+    """Configura Gemini usando el script src/gemini_tool.py"""
+    logger.step("Configurando Gemini (Google AI)")
     
     # 1. Definir rutas
     # Ubicacion del codigo fuente en tu proyecto
@@ -273,6 +461,10 @@ def setup_gemini(logger, tui):
         logger.error(f"No se encontro el archivo fuente: {source_script}")
         return
 
+    if bundle and not bundle.pip_dir():
+        logger.error("Las dependencias de Gemini no estan en el bundle; se omite (modo offline, sin red).")
+        return
+
     # 2. Crear Venv (si falta)
     if not venv_path.exists():
         logger.info("Creando entorno virtual...")
@@ -288,9 +480,17 @@ def setup_gemini(logger, tui):
     python_bin = venv_path / "bin" / "python3"
     
     try:
-        # Actualizar pip primero para evitar warnings
-        subprocess.run([str(pip_bin), "install", "-q", "--upgrade", "pip"], check=True)
-        subprocess.run([str(pip_bin), "install", "-q", "google-generativeai"], check=True)
+        if bundle:
+            # Offline: solo wheels del bundle
+            subprocess.run([str(pip_bin), "install", "-q", "--no-index", "--find-links",
+                            str(bundle.pip_dir())] + GEMINI_PIP_PACKAGES, check=True)
+        else:
+            # Actualizar pip primero para evitar warnings
+            subprocess.run([str(pip_bin), "install", "-q", "--upgrade", "pip"], check=True)
+            # Wheels bajadas mientras se usaba el menu (el indice sigue disponible)
+            pip_dir = prefetch.pip_dir() if prefetch else None
+            links = ["--find-links", str(pip_dir)] if pip_dir else []
+            subprocess.run([str(pip_bin), "install", "-q"] + links + GEMINI_PIP_PACKAGES, check=True)
     except:
         logger.error("Fallo pip install.")
         return
@@ -317,6 +517,262 @@ def setup_gemini(logger, tui):
     except Exception as e:
         logger.error(f"Error al instalar script: {e}")
 
+# ==========================================
+# COMANDOS AUXILIARES
+# ==========================================
+
+def cmd_benchmark(argv):
+    """python3 main.py benchmark [--models qwen,gemma]"""
+    parser = argparse.ArgumentParser(prog="main.py benchmark", description="Benchmark de modelos <id>-local")
+    parser.add_argument("--models", default=",".join(MODELS_MAP), help="IDs separados por coma")
+    args = parser.parse_args(argv)
+    logger = Logger(Colors.GREEN)
+
+    from src.ollama_api import OllamaClient
+    client = OllamaClient()
+    if not client.is_running():
+        logger.error(f"Ollama no responde en {client.base_url}. Ejecuta 'ollama serve'.")
+        sys.exit(1)
+
+    host = detect_host()
+    logger.step("Benchmark IA Local")
+    logger.info(f"Host: {host['cores']} nucleos / {host['cpus']} hilos, "
+                f"{host['mem_available_mb']}MB libres, SIMD: {'SI' if host['simd'] else 'NO'}")
+
+    results = benchmark.run_benchmark(client, [m.strip() for m in args.models.split(",") if m.strip()], logger)
+    if not results:
+        logger.error("No hay modelos <id>-local instalados para medir.")
+        sys.exit(1)
+    benchmark.save_results(results, host)
+
+    print(f"\n{'MODELO':<20}{'CARGA (s)':>10}{'TTFT (s)':>10}{'TOK/S':>10}{'RSS (MB)':>10}")
+    for menu_id, r in results.items():
+        print(f"{r['model']:<20}{r['load_sec']:>10}{r['ttft_sec']:>10}{r['tokens_per_sec']:>10}{r['peak_rss_mb']:>10}")
+
+    recommended = benchmark.recommend_models(list(MODELS_MAP), host, benchmark.load_results())
+    logger.success(f"Recomendados para este host: {', '.join(recommended) or 'ninguno'}")
+
+def default_selection(profile):
+    """Seleccion por defecto: la del perfil ("selection") o los ON de cada menu."""
+    selection = {
+        "pkgs_base": [x[0] for x in MENU_BASE if x[2] == "ON"],
+        "pkgs_extra": [x[0] for x in MENU_EXTRA if x[2] == "ON"],
+        "models": [x[0] for x in MENU_MODELS if x[2] == "ON"],
+        "use_gemini": True,
+        "dotfiles": True
+    }
+    selection.update(profile.get("selection", {}))
+    return selection
+
+def cmd_bundle(argv):
+    """python3 main.py bundle -o brainbash-bundle.tar [--profile FILE] [--arch aarch64]"""
+    parser = argparse.ArgumentParser(prog="main.py bundle", description="Bundle offline para instalar sin red")
+    parser.add_argument("-o", "--output", default="brainbash-bundle.tar")
+    parser.add_argument("--profile", help="Perfil JSON (default: ~/.config/brainbash/profile.json)")
+    parser.add_argument("--arch", default=platform.machine().lower())
+    parser.add_argument("--python-version", default=f"{sys.version_info[0]}.{sys.version_info[1]}",
+                        help="Version de Python del equipo destino (wheels de Gemini)")
+    parser.add_argument("--no-packages", action="store_true",
+                        help="No incluir paquetes de la distro (el destino usa su mirror local)")
+    args = parser.parse_args(argv)
+    logger = Logger(Colors.GREEN)
+
+    from src.bundle import BundleBuilder
+    from src.github import GITHUB_TOOLS, get_arch_terms
+    import tempfile
+    profile = load_profile(args.profile)
+    selection = default_selection(profile)
+    scheduler = configure_downloads(profile)
+    output = Path(args.output).resolve()
+    logger.step(f"Armando bundle ({args.arch}) -> {output}")
+
+    workdir = Path(tempfile.mkdtemp(prefix="brainbash_bundle_", dir=str(output.parent)))
+    builder = BundleBuilder(workdir, args.arch, logger)
+    try:
+        all_pkgs = selection["pkgs_base"] + selection["pkgs_extra"]
+        builder.add_github_tools([p for p in selection["pkgs_extra"] if p in GITHUB_TOOLS])
+        if "zsh" in selection["pkgs_base"]:
+            builder.add_omz()
+        if selection["models"]:
+            builder.add_ollama()
+            builder.add_models([MODELS_MAP[m] for m in selection["models"] if m in MODELS_MAP])
+
+        manager = get_manager()
+        if selection["use_gemini"]:
+            builder.add_pip(GEMINI_PIP_PACKAGES, args.python_version,
+                            "musl" if manager.distro_id == "alpine" else "glibc")
+        if all_pkgs and not args.no_packages:
+            if args.arch in get_arch_terms():
+                builder.add_distro_packages(manager, all_pkgs)
+            else:
+                logger.error(f"Paquetes de la distro omitidos: el host no es {args.arch}.")
+
+        manifest = builder.write(output, selection)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total_mb = sum(i["size"] for i in manifest["items"]) // (1024 * 1024)
+    logger.success(f"Bundle listo: {len(manifest['items'])} archivos, {total_mb}MB")
+    scheduler.report(logger)
+    logger.info(f"Uso en el equipo destino: python3 main.py --bundle {output.name}")
+
+def cmd_upgrade(argv):
+    """python3 main.py upgrade [--tools eza,bat] [-j 4]"""
+    parser = argparse.ArgumentParser(prog="main.py upgrade", description="Actualiza los binarios bajados de GitHub")
+    parser.add_argument("--tools", help="Herramientas separadas por coma (default: todas)")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="Descargas en paralelo")
+    args = parser.parse_args(argv)
+    logger = Logger(Colors.GREEN)
+
+    from src.github import GITHUB_TOOLS
+    manager = get_manager()
+    if manager.distro_id != "debian":
+        logger.info(f"En {manager.distro_id} estas herramientas vienen del gestor de paquetes: usa su upgrade.")
+        return
+
+    scheduler = configure_downloads(load_profile())
+    requested = args.tools.split(",") if args.tools else list(GITHUB_TOOLS)
+    tools = [t.strip() for t in requested if t.strip() in GITHUB_TOOLS]
+    logger.step("Actualizando binarios de GitHub")
+    start = time.monotonic()
+    results = manager.upgrade_binaries(tools, args.jobs)
+    if not results:
+        logger.info("No hay binarios administrados en /usr/local/bin.")
+        return
+
+    fmt = lambda v: ".".join(str(x) for x in v) if v else "?"
+    print(f"\n{'HERRAMIENTA':<12}{'LOCAL':>10}{'ULTIMA':>10}{'TIEMPO':>9}  ESTADO")
+    for r in results:
+        print(f"{r['tool']:<12}{fmt(r['local']):>10}{fmt(r['latest']):>10}{r['seconds']:>8}s  {r['status']}")
+    updated = sum(1 for r in results if r["status"] == "actualizado")
+    logger.success(f"{updated} actualizados en {round(time.monotonic() - start, 2)}s")
+    scheduler.report(logger)
+
+def cmd_prompt_profile(argv):
+    """python3 main.py prompt-profile [DIR...] [--budget 50]"""
+    parser = argparse.ArgumentParser(prog="main.py prompt-profile", description="Perfila y ajusta el prompt de Starship")
+    parser.add_argument("dirs", nargs="*", help="Directorios representativos (default: actual y $HOME)")
+    parser.add_argument("--budget", type=float, help="Presupuesto por prompt en ms (default: perfil)")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por medicion")
+    parser.add_argument("--command-timeout", type=int, help="Fija command_timeout de Starship en ms (default: no se toca)")
+    parser.add_argument("--config", help="starship.toml de partida (default: el de BrainBash)")
+    args = parser.parse_args(argv)
+    logger = Logger(Colors.GREEN)
+
+    from src import prompt_profile
+    if not shutil.which("starship"):
+        logger.error("Starship no esta instalado.")
+        sys.exit(1)
+
+    budget = args.budget or load_profile().get("starship", {}).get("budget_ms", 50)
+    config_path = args.config or str(Path(__file__).parent / "config" / "starship.toml")
+    dirs = [str(Path(d).resolve()) for d in args.dirs] or [os.getcwd(), str(Path.home())]
+    with open(config_path) as f:
+        original = f.read()
+
+    logger.step(f"Perfilando Starship (presupuesto {budget}ms)")
+    modules = prompt_profile.format_modules(original)
+    costs = prompt_profile.profile_modules(config_path, modules, dirs, args.runs)
+    for name, ms in sorted(costs.items(), key=lambda x: x[1], reverse=True):
+        print(f"    {name:<16}{ms:>8}ms")
+
+    disabled = prompt_profile.plan_tuning(costs, budget)
+    tuned_path = Path.home() / ".config" / "brainbash" / "starship.toml"
+    tuned_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(tuned_path, "w") as f:
+        f.write(prompt_profile.tune_config(original, disabled, args.command_timeout))
+    timeout = f" | command_timeout = {args.command_timeout}ms" if args.command_timeout else ""
+    logger.info(f"Desactivados: {', '.join(disabled) or 'ninguno'}{timeout}")
+
+    before = prompt_profile.prompt_latency(config_path, dirs, args.runs)
+    after = prompt_profile.prompt_latency(str(tuned_path), dirs, args.runs)
+    print(f"\n{'DIRECTORIO':<40}{'ANTES':>10}{'DESPUES':>10}")
+    for cwd in dirs:
+        print(f"{cwd[-40:]:<40}{before[cwd]:>8}ms{after[cwd]:>8}ms")
+    logger.success(f"Config ajustada en {tuned_path} (el zshrc la usa automaticamente).")
+
+def open_bundle(logger, manager):
+    """Lee --bundle FILE (o BRAINBASH_BUNDLE) y valida el bundle contra este host."""
+    path = os.getenv("BRAINBASH_BUNDLE")
+    if "--bundle" in sys.argv[1:-1]:
+        path = sys.argv[sys.argv.index("--bundle") + 1]
+    if not path:
+        return None
+
+    logger.step("Verificando bundle offline")
+    from src.bundle import Bundle
+    from src.github import get_arch_terms
+    try:
+        bundle = Bundle.open(path)
+    except Exception as e:
+        logger.error(f"No se pudo abrir el bundle {path}: {e}")
+        sys.exit(1)
+    errors = bundle.verify()
+    if errors:
+        for err in errors: logger.error(err)
+        sys.exit(1)
+    if bundle.manifest["arch"] not in get_arch_terms():
+        logger.error(f"El bundle es para {bundle.manifest['arch']}, este equipo es {platform.machine()}.")
+        sys.exit(1)
+    if bundle.package_files() and bundle.manifest["distro"] != manager.distro_id:
+        logger.error(f"Los paquetes del bundle son para {bundle.manifest['distro']}, no para {manager.distro_id}.")
+        sys.exit(1)
+    logger.success(f"Bundle OK: {len(bundle.manifest['items'])} archivos verificados.")
+    return bundle
+
+def cmd_build(argv):
+    """brainbash build: arma el archivo unico brainbash.pyz (zipapp)."""
+    parser = argparse.ArgumentParser(prog="main.py build", description="Arma dist/brainbash.pyz")
+    parser.add_argument("-o", "--output", default="dist/brainbash.pyz", help="Archivo de salida")
+    args = parser.parse_args(argv)
+
+    from src.build import build_zipapp
+    logger = Logger(Colors.GREEN)
+    result = build_zipapp(Path(args.output))
+    logger.success(f"{result['path']} ({result['size'] // 1024} KB, build {result['build_id']})")
+
+def run_preflight(logger, state, manager, profile, bundle=None, prefetch=None):
+    """
+    Plan de instalacion (bytes, duracion, disco y RAM) antes de tocar el sistema.
+    Si no entra en disco se aborta, salvo con --force. Devuelve los bytes a bajar.
+    """
+    from src import preflight
+    logger.step("Plan de Instalacion")
+    logger.info("Consultando tamaños (releases, registry de Ollama, gestor de paquetes)...")
+    plan = preflight.build_plan(state, manager, MODELS_MAP, GEMINI_PIP_PACKAGES, bundle, prefetch)
+    disk = preflight.check_disk(plan)
+    memory = preflight.check_memory(state["models"], detect_host(), profile)
+    if not preflight.report(logger, plan, disk, memory, runstats.load_runs()):
+        if "--force" not in sys.argv:
+            logger.error("No hay espacio suficiente. Libera disco, quita elementos o usa --force.")
+            sys.exit(1)
+        logger.warn("--force: se continua sin espacio suficiente.")
+    return sum(e["bytes"] or 0 for e in plan)
+
+def record_bootstrap():
+    """
+    Guarda el tiempo desde install.sh hasta el menu (BRAINBASH_T0 lo exporta el bootstrap).
+    Devuelve el modo registrado ('bootstrap:zipapp' / 'bootstrap:git') o None.
+    """
+    t0 = os.environ.pop("BRAINBASH_T0", None)
+    if not t0:
+        return None
+    try:
+        elapsed = round(time.time() - float(t0), 2)
+    except ValueError:
+        return None
+    mode = f"bootstrap:{os.getenv('BRAINBASH_BOOTSTRAP', 'git')}"
+    runstats.record_run(mode, {"total": elapsed})
+    return mode
+
+COMMANDS = {
+    "benchmark": cmd_benchmark,
+    "build": cmd_build,
+    "bundle": cmd_bundle,
+    "upgrade": cmd_upgrade,
+    "prompt-profile": cmd_prompt_profile,
+}
+
 # ==========================================
 # MAIN LOOP
 # ==========================================
@@ -326,17 +782,52 @@ def main():
     tui = TUI()
     logger = Logger(Colors.GREEN)
 
+    # Recomendacion de modelos segun hardware (y benchmark previo si existe)
+    host = detect_host()
+    bench_results = benchmark.load_results()
+    recommended = benchmark.recommend_models([x[0] for x in MENU_MODELS], host, bench_results)
+
     # ESTADO INICIAL
     state = {
         "update_sys": False, # Por defecto NO actualiza
         "pkgs_base": [x[0] for x in MENU_BASE],  # Por defecto todos ON
         "pkgs_extra": [x[0] for x in MENU_EXTRA], # Por defecto todos ON
-        "models": [],       # Por defecto ningun modelo local
+        # Solo modelos medidos y aprobados: un modelo sin benchmark no se preselecciona
+        # (evita descargas de GB por defecto); el hardware solo decide el [Recomendado]
+        "models": benchmark.benchmarked_models([x[0] for x in MENU_MODELS], bench_results),
         "use_gemini": True, # Gemini SI por defecto
         "dotfiles": True    # Dotfiles SI por defecto
     }
 
+    # Contenedor efimero: auto-detectado o forzado con "container_mode" en el perfil
+    profile = load_profile()
+    scheduler = configure_downloads(profile)
+    container_cfg = profile.get("container_mode", "auto")
+    manager.container_mode = detect_container() if container_cfg == "auto" else bool(container_cfg)
+    manager.clean_indexes = container_cfg is True
+
+    # Modo offline: se parte de lo que trae el bundle
+    bundle = open_bundle(logger, manager)
+    if bundle:
+        manager.bundle = bundle
+        state.update(bundle.selection)
+
+    # Se mide antes del menu; el resultado se muestra al final (el menu limpia la pantalla)
+    bootstrap_mode = record_bootstrap()
+
+    # Descarga anticipada mientras se usa el menu (nunca en modo offline)
+    prefetcher = None
+    prefetch_cfg = profile.get("prefetch", {})
+    if not bundle and prefetch_cfg.get("enabled", True):
+        from src.prefetch import Prefetcher
+        prefetcher = Prefetcher(manager, MODELS_MAP, GEMINI_PIP_PACKAGES, prefetch_cfg.get("workers", 2))
+        manager.prefetch = prefetcher
+        prefetcher.start()
+
     while True:
+        if prefetcher:
+            prefetcher.update(state)
+
         # Calcular textos para el menu principal
         c_base = len(state["pkgs_base"])
         c_extra = len(state["pkgs_extra"])
@@ -396,7 +887,8 @@ def main():
             current_opts = []
             for tag, desc, default in MENU_MODELS:
                 status = "ON" if tag in state["models"] else "OFF"
-                current_opts.append((tag, desc, status))
+                hint = "[Recomendado]" if tag in recommended else "[No recomendado]"
+                current_opts.append((tag, f"{desc} {hint}", status))
             state["models"] = tui.show_checklist("IA Local", "Selecciona modelos: |Espacio para seleccionar| |Enter para confirmar y volver|", current_opts)
 
         elif selection == "gemini":
@@ -409,27 +901,63 @@ def main():
     # EJECUCION DE TAREAS (ORDEN ESPECIFICO)
     # ==========================================
     
+    if prefetcher:
+        summary = prefetcher.handoff()
+        logger.info(f"Descarga anticipada: {summary['done']} listos ({summary['bytes'] // (1024 * 1024)}MB), "
+                    f"{summary['pending']} siguen en segundo plano.")
+
+    plan_bytes = run_preflight(logger, state, manager, profile, bundle, prefetcher)
+
+    # La API Key se pide antes de arrancar: el resto corre sin interaccion
+    if state["use_gemini"]:
+        ask_gemini_key(logger)
+
     logger.step("INICIANDO DESPLIEGUE")
+    timer = runstats.PhaseTimer()
 
     # 1. Update (Opcional)
     if state["update_sys"]:
-        manager.update()
+        if bundle:
+            logger.info("[Skip] Actualizacion del sistema: modo offline.")
+        else:
+            with timer.phase("update"), scheduler.external():
+                manager.update()
 
     # 2. Paquetes (Base + Extra combinados)
     all_pkgs = state["pkgs_base"] + state["pkgs_extra"]
     if all_pkgs:
         logger.step("Instalando Paquetes")
-        manager.install(all_pkgs)
+        if manager.container_mode:
+            logger.info("Modo contenedor activo (perfil: container_mode).")
+        footprint_before = manager.footprint()
+        with timer.phase("packages"), scheduler.external():
+            manager.install(all_pkgs)
+        footprint_after = manager.footprint()
+        # Tiempo y espacio de la instalacion, comparables entre modo normal y contenedor
+        pkg_mode = "packages:container" if manager.container_mode else "packages:normal"
+        pkg_stats = {"total": timer.phases["packages"]}
+        if footprint_before and footprint_after:
+            # Lo instalado + lo que crecio la cache (si se vacio, lo borrado eran descargas
+            # anticipadas del menu, no parte de la instalacion)
+            grown = (footprint_after["installed"] - footprint_before["installed"]
+                     + max(0, footprint_after["cache"] - footprint_before["cache"]))
+            pkg_stats["disk_mb"] = grown // (1024 * 1024)
+        pkg_runs = runstats.record_run(pkg_mode, pkg_stats)
+        runstats.report(logger, pkg_mode, pkg_runs, ["packages:normal", "packages:container"])
 
     # 3. Shell (OMZ) - Se instala si seleccionó Zsh
     if "zsh" in state["pkgs_base"]:
         logger.step("Configurando Shell")
-        install_omz(logger)
+        with timer.phase("shell"):
+            install_omz(logger, bundle, prefetcher)
 
     # 4. Dotfiles
     if state["dotfiles"]:
         logger.step("Aplicando Config. Personales")
-        repo_root = Path(__file__).parent.resolve()
+        from src.dotfiles import DotfileManager
+        # Sin resolve(): desde el .pyz los symlinks tienen que apuntar a .../brainbash/current,
+        # no al directorio de este build (que se borra cuando llega uno nuevo)
+        repo_root = Path(os.path.abspath(__file__)).parent
         dm = DotfileManager(repo_root, Path.home())
         
         for src, dest in DOTFILES_MAP.items():
@@ -439,15 +967,38 @@ def main():
     # 5. IA Local (Ollama + Modelos)
     if state["models"]:
         logger.step("Configurando IA Local")
-        setup_ollama(logger, state["models"])
+        with timer.phase("ollama"):
+            setup_ollama(logger, state["models"], bundle, prefetcher)
 
     # 6. IA Nube (Gemini)
     if state["use_gemini"]:
-        setup_gemini(logger, tui)
+        with timer.phase("gemini"):
+            setup_gemini(logger, tui, bundle, prefetcher)
+
+    if prefetcher:
+        prefetcher.stop()
+        prefetcher.cleanup()
 
     logger.step("FINALIZADO")
+    mode = "offline" if bundle else "online"
+    runs = runstats.record_run(mode, {"total": timer.total(), "phases": timer.phases})
+    # Velocidad efectiva (bytes planeados / duracion) para estimar la proxima corrida
+    if plan_bytes:
+        runstats.record_run("preflight", {"total": timer.total(), "bytes": plan_bytes})
+    runstats.report(logger, mode, runs, ["online", "offline"])
+    if bootstrap_mode:
+        runstats.report(logger, bootstrap_mode, runs, ["bootstrap:zipapp", "bootstrap:git"])
+    scheduler.report(logger)
     logger.info("Reinicia tu terminal para ver los cambios. O usa 'zsh' para iniciar.")
 
+def cli():
+    """Punto de entrada (python3 main.py y brainbash.pyz)."""
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+            COMMANDS[sys.argv[1]](sys.argv[2:])
+        else:
+            main()
+    except KeyboardInterrupt: sys.exit(0)
+
 if __name__ == "__main__":
-    try: main()
-    except KeyboardInterrupt: sys.exit(0)
\ No newline at end of file
+    cli()
\ No newline at end of file
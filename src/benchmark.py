@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# Solo para anotaciones: el menu usa este modulo sin tocar la red
+if TYPE_CHECKING:
+    from .ollama_api import OllamaClient
+
+# ==========================================
+# BENCHMARK DE MODELOS LOCALES
+# ==========================================
+
+RESULTS_PATH = Path.home() / ".config" / "brainbash" / "benchmark.json"
+
+# Prompts fijos: cortos, para que los numeros sean comparables entre hosts
+BENCH_PROMPTS = [
+    "Lista los archivos ocultos de un directorio en Linux. Solo el comando.",
+    "Explica en una frase que hace 'chmod 755'.",
+    "Escribe una funcion en Python que invierta una cadena.",
+]
+
+# Espera maxima a que /api/ps deje de listar un modelo descargado
+UNLOAD_TIMEOUT = 30.0
+
+# Umbrales para considerar un modelo "usable" en este host
+MIN_TOKENS_PER_SEC = 5.0
+MAX_TTFT_SEC = 10.0
+
+# Requisitos minimos cuando todavia no hay benchmark (por ID de menu)
+MODEL_REQUIREMENTS = {
+    "qwen": {"mem_mb": 1024, "cores": 1, "simd": False},
+    "gemma": {"mem_mb": 1536, "cores": 2, "simd": False},
+    "phi": {"mem_mb": 4096, "cores": 4, "simd": True},
+}
+
+class _RssSampler(threading.Thread):
+    """Muestrea el RSS de los procesos 'ollama' (servidor + runner) y guarda el pico."""
+
+    def __init__(self, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop_event = threading.Event()
+
+    def _current_rss_kb(self) -> int:
+        total = 0
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    status = f.read()
+            except OSError:
+                continue
+            if not status.startswith("Name:\tollama"):
+                continue
+            for line in status.splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+                    break
+        return total
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak_kb = max(self.peak_kb, self._current_rss_kb())
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        return self.peak_kb
+
+def _find_local_tag(installed: List[str], menu_id: str) -> Optional[str]:
+    """Busca '<id>-local' (con o sin ':latest') entre los modelos instalados."""
+    for name in installed:
+        if name.split(":")[0] == f"{menu_id}-local":
+            return name
+    return None
+
+def _same_model(a: str, b: str) -> bool:
+    """'qwen-local' y 'qwen-local:latest' son el mismo modelo."""
+    return (a if ":" in a else f"{a}:latest") == (b if ":" in b else f"{b}:latest")
+
+def unload_model(client: "OllamaClient", model: str, timeout: float = UNLOAD_TIMEOUT):
+    """Descarga el modelo de memoria y espera a que /api/ps ya no lo liste."""
+    client.unload(model)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not any(_same_model(model, name) for name in client.running_models()):
+            return
+        time.sleep(0.2)
+
+def benchmark_model(client: "OllamaClient", model: str, prompts: List[str] = BENCH_PROMPTS) -> dict:
+    """
+    Corre los prompts fijos contra un modelo y devuelve promedios de
+    time-to-first-token y tokens/s, mas el pico de RSS de Ollama.
+    El modelo se carga antes de medir (la carga no entra en el TTFT) y se
+    descarga al final, asi el RSS del siguiente no incluye a este.
+    """
+    sampler = _RssSampler()
+    sampler.start()
+    ttfts, rates = [], []
+    try:
+        start = time.monotonic()
+        client.load(model)
+        load_sec = time.monotonic() - start
+        for prompt in prompts:
+            start = time.monotonic()
+            first = None
+            tokens = 0
+            final = {}
+            for chunk in client.generate_stream(model, prompt):
+                if chunk.get("response"):
+                    tokens += 1
+                    if first is None:
+                        first = time.monotonic()
+                if chunk.get("done"):
+                    final = chunk
+            end = time.monotonic()
+            first = first or end
+            ttfts.append(first - start)
+
+            # Preferimos las metricas del propio Ollama (eval_duration en ns)
+            if final.get("eval_count") and final.get("eval_duration"):
+                rates.append(final["eval_count"] / (final["eval_duration"] / 1e9))
+            elif end > first:
+                rates.append(tokens / (end - first))
+    finally:
+        peak_kb = sampler.stop()
+        unload_model(client, model)
+
+    return {
+        "model": model,
+        "load_sec": round(load_sec, 3),
+        "ttft_sec": round(sum(ttfts) / len(ttfts), 3),
+        "tokens_per_sec": round(sum(rates) / len(rates), 2) if rates else 0.0,
+        "peak_rss_mb": peak_kb // 1024,
+        "timestamp": int(time.time()),
+    }
+
+def run_benchmark(client: "OllamaClient", menu_ids: List[str], logger) -> Dict[str, dict]:
+    """Ejecuta el benchmark para cada '<id>-local' instalado."""
+    installed = client.list_models()
+    # Lo que ya este cargado (keep_alive) inflaria el RSS de cada medicion
+    for name in client.running_models():
+        unload_model(client, name)
+    results = {}
+    for menu_id in menu_ids:
+        tag = _find_local_tag(installed, menu_id)
+        if not tag:
+            logger.info(f"[Skip] {menu_id}-local no esta instalado.")
+            continue
+        logger.info(f"Midiendo {tag}...")
+        try:
+            results[menu_id] = benchmark_model(client, tag)
+        except Exception as e:
+            logger.error(f"Fallo el benchmark de {tag}: {e}")
+    return results
+
+def save_results(results: Dict[str, dict], host: dict, path: Path = RESULTS_PATH):
+    """Fusiona con resultados previos (un modelo no medido conserva su ultima medicion)."""
+    data = load_results(path)
+    data.setdefault("models", {}).update(results)
+    data["host"] = host
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def load_results(path: Path = RESULTS_PATH) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def passes_benchmark(menu_id: str, results: Optional[dict] = None) -> bool:
+    """True solo si el modelo fue medido en este host y cumple los umbrales."""
+    bench = (results or {}).get("models", {}).get(menu_id)
+    return bool(bench) and bench["tokens_per_sec"] >= MIN_TOKENS_PER_SEC and bench["ttft_sec"] <= MAX_TTFT_SEC
+
+def is_recommended(menu_id: str, host: dict, results: Optional[dict] = None) -> bool:
+    """
+    Con benchmark previo decide por velocidad medida.
+    Sin benchmark decide por memoria disponible, nucleos y SIMD del host.
+    """
+    if (results or {}).get("models", {}).get(menu_id):
+        return passes_benchmark(menu_id, results)
+
+    req = MODEL_REQUIREMENTS.get(menu_id)
+    if not req:
+        return False
+    if host["mem_available_mb"] < req["mem_mb"]: return False
+    if host["cores"] < req["cores"]: return False
+    if req["simd"] and not host["simd"]: return False
+    return True
+
+def recommend_models(menu_ids: List[str], host: dict, results: Optional[dict] = None) -> List[str]:
+    return [m for m in menu_ids if is_recommended(m, host, results)]
+
+def benchmarked_models(menu_ids: List[str], results: Optional[dict] = None) -> List[str]:
+    """Los que se pueden preseleccionar: medidos y aprobados (sin fallback por hardware)."""
+    return [m for m in menu_ids if passes_benchmark(m, results)]
@@ -0,0 +1,78 @@
+import hashlib
+import shutil
+import tempfile
+import zipapp
+from pathlib import Path
+
+# ==========================================
+# BUILD: ARCHIVO UNICO brainbash.pyz (zipapp)
+# ==========================================
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Lo que necesita una instalacion (sin .git, tests ni caches)
+INCLUDE = ["main.py", "src", "config"]
+EXCLUDE = shutil.ignore_patterns("__pycache__", "*.pyc", "*.gen")
+
+# Punto de entrada del .pyz. Los dotfiles son symlinks y los scripts se leen del disco,
+# asi que el contenido se extrae una vez (por build) y se ejecuta desde ahi.
+BOOTSTRAP = '''import os
+import re
+import shutil
+import sys
+import zipfile
+
+BUILD_ID = "{build_id}"
+
+def _app_dir():
+    base = os.path.join(os.path.expanduser("~"), ".local", "share", "brainbash")
+    target = os.path.join(base, BUILD_ID)
+    if not os.path.exists(os.path.join(target, ".complete")):
+        with zipfile.ZipFile(os.path.dirname(os.path.abspath(__file__))) as archive:
+            archive.extractall(target)
+        open(os.path.join(target, ".complete"), "w").close()
+    # Enlace estable para los dotfiles: ~/.local/share/brainbash/current
+    current = os.path.join(base, "current")
+    if os.path.realpath(current) != os.path.realpath(target):
+        tmp = current + ".tmp"
+        if os.path.lexists(tmp): os.remove(tmp)
+        os.symlink(target, tmp)
+        os.replace(tmp, current)
+        # Los builds anteriores ya no los usa nadie: los dotfiles apuntan a 'current'
+        for name in os.listdir(base):
+            if re.fullmatch(r"[0-9a-f]{{12}}", name) and name != BUILD_ID:
+                shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+    return current
+
+sys.path.insert(0, _app_dir())
+import main
+main.cli()
+'''
+
+def build_zipapp(output: Path) -> dict:
+    """Arma el .pyz comprimido y devuelve {path, size, build_id}."""
+    output = Path(output).resolve()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix="brainbash_build_"))
+    try:
+        for name in INCLUDE:
+            source = REPO_ROOT / name
+            if source.is_dir():
+                shutil.copytree(str(source), str(staging / name), ignore=EXCLUDE)
+            else:
+                shutil.copy2(str(source), str(staging / name))
+
+        # El ID depende del contenido: cada build nuevo se extrae en su propio directorio
+        digest = hashlib.sha256()
+        for path in sorted(staging.rglob("*")):
+            if path.is_file():
+                digest.update(str(path.relative_to(staging)).encode())
+                digest.update(path.read_bytes())
+        build_id = digest.hexdigest()[:12]
+
+        with open(staging / "__main__.py", "w") as f:
+            f.write(BOOTSTRAP.format(build_id=build_id))
+        zipapp.create_archive(str(staging), str(output), interpreter="/usr/bin/env python3", compressed=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return {"path": output, "size": output.stat().st_size, "build_id": build_id}
@@ -0,0 +1,285 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .downloads import SCHEDULER, fetch, sha256_file
+from .github import download_tool
+from . import ollama_api
+
+# ==========================================
+# BUNDLE OFFLINE (instalacion sin red)
+# ==========================================
+# Un bundle es un .tar (o un directorio) con todo lo que una corrida baja de internet:
+#
+#   manifest.json
+#   github/<tool>/<asset>             binarios de Paquetes Extra
+#   omz/ohmyzsh.tar.gz                Oh My Zsh
+#   ollama/ollama-linux-<arch>.tgz    motor Ollama
+#   models/{manifests,blobs}/...      mismo layout que ~/.ollama/models
+#   pip/*.whl                         dependencias de Gemini
+#   packages/*.deb|apk|rpm            paquetes de la distro (solo la distro del host)
+
+BUNDLE_VERSION = 1
+CACHE_DIR = Path.home() / ".cache" / "brainbash" / "bundle"
+
+OMZ_TARBALL_URL = "https://github.com/ohmyzsh/ohmyzsh/archive/refs/heads/master.tar.gz"
+OLLAMA_TARBALL_URL = "https://github.com/ollama/ollama/releases/latest/download/ollama-linux-{arch}.tgz"
+OLLAMA_ARCH = {"x86_64": "amd64", "amd64": "amd64", "aarch64": "arm64", "arm64": "arm64"}
+
+PACKAGE_SUFFIXES = (".deb", ".apk", ".rpm")
+
+def safe_extractall(tar: tarfile.TarFile, dest: Path):
+    """
+    extractall sin path traversal: nada fuera de dest (../, rutas absolutas,
+    links que salen del directorio) ni dispositivos. Usa filter="data" si existe.
+    """
+    if hasattr(tarfile, "data_filter"):
+        tar.extractall(dest, filter="data")
+        return
+    # Pythons sin filtros de extraccion (< 3.8.17 / 3.11.4): validacion manual
+    root = os.path.realpath(dest)
+    for member in tar.getmembers():
+        target = os.path.realpath(os.path.join(root, member.name))
+        if member.isdev() or os.path.isabs(member.name) or os.path.commonpath([root, target]) != root:
+            raise ValueError(f"Miembro inseguro en el tar: {member.name}")
+        if member.issym() or member.islnk():
+            base = os.path.dirname(target) if member.issym() else root
+            link = os.path.realpath(os.path.join(base, member.linkname))
+            if os.path.isabs(member.linkname) or os.path.commonpath([root, link]) != root:
+                raise ValueError(f"Link inseguro en el tar: {member.name} -> {member.linkname}")
+    tar.extractall(dest)
+
+class BundleBuilder:
+    """Descarga cada entrada externa a un directorio de trabajo y arma el manifest."""
+
+    def __init__(self, workdir: Path, arch: str, logger):
+        self.root = Path(workdir)
+        self.arch = arch
+        self.logger = logger
+        self.items = []
+        self.distro = None
+
+    def _add(self, kind: str, name: str, rel_path: str, info: dict):
+        self.items.append({"kind": kind, "name": name, "path": rel_path,
+                           "size": info["size"], "sha256": info["sha256"]})
+
+    def _fetch(self, kind: str, name: str, url: str, rel_path: str, headers: Optional[dict] = None):
+        self.logger.info(f"[Bundle] {kind}: {name}")
+        self._add(kind, name, rel_path, fetch(url, self.root / rel_path, headers))
+
+    def add_github_tools(self, tools: List[str]):
+        for tool in tools:
+            self.logger.info(f"[Bundle] github: {tool}")
+            # download_tool verifica el sha256 publicado en el release
+            asset = download_tool(tool, self.root / "github" / tool, self.arch)
+            if not asset:
+                self.logger.error(f"[Bundle] Sin asset de {tool} para {self.arch}")
+                continue
+            self._add("github", tool, f"github/{tool}/{asset.name}",
+                      {"size": asset.stat().st_size, "sha256": sha256_file(asset)})
+
+    def add_omz(self):
+        self._fetch("omz", "ohmyzsh", OMZ_TARBALL_URL, "omz/ohmyzsh.tar.gz")
+
+    def add_ollama(self):
+        arch = OLLAMA_ARCH.get(self.arch, self.arch)
+        self._fetch("ollama", "ollama", OLLAMA_TARBALL_URL.format(arch=arch), f"ollama/ollama-linux-{arch}.tgz")
+
+    def add_models(self, models: List[str]):
+        """Baja manifest + blobs directo del registry (no necesita ollama en el host)."""
+        for name in models:
+            rel = f"models/{ollama_api.manifest_rel_path(name)}"
+            # Guardamos el manifest tal cual lo sirve el registry
+            self._fetch("model", name, ollama_api.registry_manifest_url(name), rel,
+                        {"Accept": ollama_api.MANIFEST_ACCEPT})
+            with open(self.root / rel) as f:
+                manifest = json.load(f)
+            for layer in [manifest["config"]] + manifest["layers"]:
+                digest = layer["digest"]
+                blob_rel = f"models/blobs/{digest.replace(':', '-')}"
+                if (self.root / blob_rel).exists():
+                    continue
+                self._fetch("model", name, ollama_api.registry_blob_url(name, digest), blob_rel)
+
+    def add_pip(self, packages: List[str], python_version: str, libc: str = "glibc"):
+        """Wheels para la arquitectura/Python destino (pip download --platform)."""
+        self.logger.info(f"[Bundle] pip: {', '.join(packages)} (Python {python_version}, {libc})")
+        dest = self.root / "pip"
+        dest.mkdir(parents=True, exist_ok=True)
+        if libc == "musl":
+            platforms = [f"musllinux_1_1_{self.arch}", f"musllinux_1_2_{self.arch}"]
+        else:
+            platforms = [f"manylinux2014_{self.arch}", f"manylinux_2_28_{self.arch}"]
+        cmd = [sys.executable, "-m", "pip", "download", "-q", "-d", str(dest),
+               "--only-binary=:all:", "--python-version", python_version]
+        for plat in platforms:
+            cmd += ["--platform", plat]
+        subprocess.run(cmd + packages, check=True)
+        for wheel in sorted(dest.iterdir()):
+            self._add("pip", wheel.name, f"pip/{wheel.name}",
+                      {"size": wheel.stat().st_size, "sha256": sha256_file(wheel)})
+
+    def add_distro_packages(self, manager, packages: List[str]):
+        """Paquetes de la distro del host (apt/apk/dnf en modo solo-descarga)."""
+        dest = self.root / "packages"
+        dest.mkdir(parents=True, exist_ok=True)
+        with SCHEDULER.external():
+            manager.download(packages, str(dest))
+        for pkg in sorted(dest.iterdir()):
+            if pkg.name.endswith(PACKAGE_SUFFIXES):
+                self._add("package", pkg.name, f"packages/{pkg.name}",
+                          {"size": pkg.stat().st_size, "sha256": sha256_file(pkg)})
+        # apt deja 'partial/' y 'lock' en el directorio
+        for leftover in ["partial", "lock"]:
+            target = dest / leftover
+            if target.is_dir(): shutil.rmtree(target, ignore_errors=True)
+            elif target.exists(): target.unlink()
+        self.distro = manager.distro_id
+
+    def write(self, output: Path, selection: dict) -> dict:
+        manifest = {
+            "version": BUNDLE_VERSION,
+            "created": int(time.time()),
+            "arch": self.arch,
+            "distro": self.distro,
+            "selection": selection,
+            "items": self.items,
+        }
+        with open(self.root / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+        # Sin compresion: casi todo el contenido ya esta comprimido
+        with tarfile.open(output, "w") as tar:
+            for entry in sorted(self.root.iterdir()):
+                tar.add(str(entry), arcname=entry.name)
+        return manifest
+
+class Bundle:
+    """Bundle ya armado, listo para consumir sin red."""
+
+    def __init__(self, root: Path, manifest: dict):
+        self.root = Path(root)
+        self.manifest = manifest
+
+    @classmethod
+    def open(cls, path) -> "Bundle":
+        """Acepta un directorio o un .tar (se extrae a ~/.cache/brainbash/bundle)."""
+        path = Path(path)
+        if path.is_dir():
+            root = path
+            with open(root / "manifest.json") as f:
+                manifest = json.load(f)
+        else:
+            root = CACHE_DIR / path.name.split(".")[0]
+            with tarfile.open(path) as tar:
+                manifest = json.load(tar.extractfile("manifest.json"))
+                # Reusamos la extraccion previa si es el mismo bundle
+                cached = root / "manifest.json"
+                if not cached.exists() or json.loads(cached.read_text()) != manifest:
+                    shutil.rmtree(root, ignore_errors=True)
+                    root.mkdir(parents=True)
+                    safe_extractall(tar, root)
+        if manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Version de bundle no soportada: {manifest.get('version')}")
+        return cls(root, manifest)
+
+    @property
+    def selection(self) -> dict:
+        return self.manifest.get("selection", {})
+
+    def verify(self) -> List[str]:
+        """Devuelve la lista de archivos faltantes o corruptos."""
+        errors = []
+        for item in self.manifest["items"]:
+            path = self.root / item["path"]
+            if not path.exists():
+                errors.append(f"falta {item['path']}")
+            elif sha256_file(path) != item["sha256"]:
+                errors.append(f"sha256 invalido: {item['path']}")
+        return errors
+
+    def _paths(self, kind: str, name: Optional[str] = None) -> List[Path]:
+        return [self.root / i["path"] for i in self.manifest["items"]
+                if i["kind"] == kind and (name is None or i["name"] == name)]
+
+    def github_asset(self, tool: str) -> Optional[Path]:
+        paths = self._paths("github", tool)
+        return paths[0] if paths else None
+
+    def omz_tarball(self) -> Optional[Path]:
+        paths = self._paths("omz")
+        return paths[0] if paths else None
+
+    def ollama_tarball(self) -> Optional[Path]:
+        paths = self._paths("ollama")
+        return paths[0] if paths else None
+
+    def has_model(self, name: str) -> bool:
+        return bool(self._paths("model", name))
+
+    def pip_dir(self) -> Optional[Path]:
+        return self.root / "pip" if self._paths("pip") else None
+
+    def package_files(self) -> List[str]:
+        return [str(p) for p in self._paths("package")]
+
+    def package_dir(self) -> Optional[str]:
+        """Directorio con los paquetes de la distro (repositorio local para install_local)."""
+        return str(self.root / "packages") if self._paths("package") else None
+
+    def import_models(self, dest: str):
+        """Copia manifests y blobs al directorio de modelos de Ollama."""
+        copy_models(self.root / "models", dest)
+
+def fetch_model(name: str, root: Path, cancel=None) -> int:
+    """
+    Baja manifest + blobs de un modelo a root/{manifests,blobs} con prioridad baja
+    (no le quita ancho de banda a los archivos chicos). Blobs primero y el manifest
+    al final: un modelo a medias no se importa como valido. Devuelve los bytes bajados.
+    """
+    manifest_path = Path(root) / ollama_api.manifest_rel_path(name)
+    if manifest_path.exists():
+        return 0
+    manifest = ollama_api.registry_manifest(name)
+    total = 0
+    for layer in [manifest["config"]] + manifest["layers"]:
+        blob = Path(root) / "blobs" / layer["digest"].replace(":", "-")
+        if blob.exists():
+            continue
+        info = fetch(ollama_api.registry_blob_url(name, layer["digest"]), blob, cancel=cancel, priority="low")
+        if "sha256:" + info["sha256"] != layer["digest"]:
+            blob.unlink()
+            raise ValueError(f"sha256 invalido en {name}")
+        total += info["size"]
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+    return total
+
+def copy_models(source: Path, dest: str):
+    """Copia un arbol {manifests,blobs} (layout de ~/.ollama/models) sin pisar lo existente."""
+    if not source.exists():
+        return
+    dest_path = Path(dest)
+    # Sin los blobs a medio bajar (fetch los escribe como .part)
+    files = [p.relative_to(source) for p in sorted(source.rglob("*"))
+             if p.is_file() and not p.name.endswith(".part")]
+    if not files:
+        return
+    try:
+        for rel in files:
+            target = dest_path / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if not target.exists():
+                shutil.copy2(str(source / rel), str(target))
+    except PermissionError:
+        # Directorio del servicio systemd (usuario 'ollama')
+        subprocess.run(["sudo", "mkdir", "-p", dest], check=True)
+        subprocess.run(["sudo", "cp", "-n", "--parents"] + [str(rel) for rel in files] + [dest],
+                       cwd=str(source), check=True)
+        subprocess.run(["sudo", "chown", "-R", "ollama:ollama", dest], check=False)
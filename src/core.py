@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+import re
 import shutil
 import subprocess
 import os
@@ -34,6 +35,28 @@ PACKAGE_MAP = {
     "starship": {"default": "starship"} # Prompt (requerido por tu zshrc)
 }
 
+# Unidades que imprimen apt/dnf ("12.3 MB", "40 M", "1,024 kB", "5 MiB")
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+def parse_size(text: str) -> Optional[int]:
+    """'12.3 MB' -> bytes (aproximado: kB y KiB se tratan igual)."""
+    match = re.match(r"\s*([\d.,]+)\s*([kKmMgG]?)", text or "")
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", ""))
+    return int(number * SIZE_UNITS[match.group(2).lower()])
+
+def dir_size(path: str) -> int:
+    """Bytes de los archivos bajo path (lo que no se puede leer se ignora)."""
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
 # ==========================================
 # CLASE ABSTRACTA
 # ==========================================
@@ -41,6 +64,14 @@ class PackageManager(ABC):
     def __init__(self, distro_id: str):
         self.distro_id = distro_id
         self._sudo_cmd = [] if os.geteuid() == 0 else ["sudo"]
+        # Bundle offline (src/bundle.py). Si esta seteado no se usa la red.
+        self.bundle = None
+        # Contenedor efimero: sin docs, sin recomendados, sin cache ni fsync
+        self.container_mode = False
+        # Borrar indices del gestor al terminar: solo con "container_mode": true explicito
+        self.clean_indexes = False
+        # Descargas anticipadas mientras el menu esta abierto (src/prefetch.py)
+        self.prefetch = None
         
     @property
     def sudo_cmd(self) -> List[str]:
@@ -63,4 +94,39 @@ class PackageManager(ABC):
 
     @abstractmethod
     def install(self, packages: List[str]):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def download(self, packages: List[str], dest: str):
+        """Descarga los paquetes (y dependencias) a dest sin instalarlos."""
+        pass
+
+    @abstractmethod
+    def install_local(self, pool: str, packages: List[str]):
+        """
+        Instala 'packages' sin red, tomando los archivos del directorio 'pool' (el de un bundle).
+        El pool es solo una fuente: el gestor elige que dependencias le faltan al host.
+        """
+        pass
+
+    def prefetch_commands(self, packages: List[str]) -> List[List[str]]:
+        """
+        Comandos (sin interaccion ni salida) que refrescan indices y dejan los paquetes
+        en la cache del gestor para que install() no tenga que bajarlos. [] = no soportado.
+        """
+        return []
+
+    def estimate_download(self, packages: List[str]) -> Optional[dict]:
+        """
+        Lo que bajaria install() segun el gestor: {"download": bytes, "disk": bytes}.
+        None si el gestor no lo informa sin descargar.
+        """
+        return None
+
+    def footprint(self) -> Optional[dict]:
+        """
+        Espacio propio del gestor: {"installed": bytes de los paquetes instalados segun su
+        base de datos, "cache": bytes de su cache}. None = no soportado. Se compara antes y
+        despues de install() (disk_usage("/") tambien contaria las descargas anticipadas).
+        """
+        return None
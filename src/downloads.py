@@ -0,0 +1,278 @@
+import hashlib
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# ==========================================
+# DESCARGAS HTTP (en proceso, sin curl)
+# ==========================================
+
+CHUNK_SIZE = 256 * 1024
+USER_AGENT = "brainbash"
+
+# Prioridad -> peso en el reparto del ancho de banda
+PRIORITY_WEIGHTS = {"high": 8, "normal": 2, "low": 1}
+
+# Parte del limite para apt/dnf (Dl-Limit/throttle) mientras corren; fetch se queda con el resto
+EXTERNAL_SHARE = 0.5
+
+# Hasta este tamaño un archivo es "chico" (tarballs que frenan el resto de la instalacion)
+SMALL_DOWNLOAD = 32 * 1024 * 1024
+
+class DownloadCancelled(Exception):
+    """La descarga se corto a pedido (ej: el item se des-selecciono en el menu)."""
+
+class _Stream:
+    """Una descarga en curso, vista por el planificador."""
+
+    def __init__(self, name: str, priority: str, vtime: float):
+        self.name = name
+        self.priority = priority
+        self.weight = PRIORITY_WEIGHTS[priority]
+        self.vtime = vtime
+        self.bytes = 0
+        self.start = time.monotonic()
+        self.end = None
+
+class DownloadScheduler:
+    """
+    Reparte un limite total de ancho de banda (token bucket) entre todas las descargas.
+    Cada chunk pide tokens; si hay varias esperando, pasa la de menor tiempo virtual
+    (bytes / peso), asi los archivos chicos salen antes sin frenar del todo a los grandes.
+    Sin limite (rate=None) no hay tokens: mientras baja algo de prioridad "high" solo
+    avanza una descarga "low" (la mas vieja) y el resto espera.
+    """
+
+    def __init__(self, rate: Optional[float] = None):
+        self._cond = threading.Condition()
+        self._waiting: List[_Stream] = []
+        self._active: List[_Stream] = []
+        self.streams: List[_Stream] = []
+        # Tramos con el mismo conjunto de descargas activas: bytes de cada una en el tramo
+        self._epoch_start = time.monotonic()
+        self._epoch_bytes: Dict[_Stream, int] = {}
+        # (duracion, indice de Jain) de cada tramo con 2+ descargas compitiendo
+        self._contended: List[tuple] = []
+        # apt/dnf corriendo con su parte del limite (ver external())
+        self._external = 0
+        self.configure(rate)
+
+    def configure(self, rate: Optional[float]):
+        """rate en bytes/s (None o 0 = sin limite)."""
+        with self._cond:
+            self.rate = rate or None
+            # Rafaga de 1/4 de segundo (minimo un chunk)
+            self.capacity = max(CHUNK_SIZE, self.rate / 4) if self.rate else 0
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+
+    def limit_kbps(self) -> Optional[int]:
+        """Limite total en KB/s."""
+        return max(1, int(self.rate // 1024)) if self.rate else None
+
+    def external_limit_kbps(self) -> Optional[int]:
+        """Limite en KB/s para herramientas externas (apt Dl-Limit, dnf throttle): su parte del total."""
+        return max(1, int(self.rate * EXTERNAL_SHARE // 1024)) if self.rate else None
+
+    @contextmanager
+    def external(self):
+        """
+        Envuelve un apt/dnf limitado con external_limit_kbps: mientras corre, las
+        descargas propias se quedan con el resto del limite y el total no se pasa.
+        """
+        with self._cond:
+            self._refill()
+            self._external += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._refill()
+                self._external -= 1
+                self._cond.notify_all()
+
+    def _current_rate(self) -> float:
+        return self.rate * (1 - EXTERNAL_SHARE) if self._external else self.rate
+
+    def open(self, name: str, size: Optional[int] = None, priority: Optional[str] = None) -> _Stream:
+        if priority is None:
+            if size is None: priority = "normal"
+            elif size <= SMALL_DOWNLOAD: priority = "high"
+            else: priority = "low"
+        with self._cond:
+            # Entra al tiempo virtual de las activas: no acapara el enlace por llegar tarde
+            vtime = min((s.vtime for s in self._active), default=0.0)
+            stream = _Stream(name, priority, vtime)
+            self._close_epoch()
+            self._active.append(stream)
+            self.streams.append(stream)
+        return stream
+
+    def close(self, stream: _Stream):
+        with self._cond:
+            stream.end = time.monotonic()
+            if stream in self._active:
+                self._close_epoch()
+                self._active.remove(stream)
+            self._cond.notify_all()
+
+    def _close_epoch(self):
+        """Cierra el tramo actual: si hubo competencia (con limite), guarda su equidad."""
+        now = time.monotonic()
+        if self.rate and len(self._active) > 1 and now > self._epoch_start:
+            shares = [self._epoch_bytes.get(s, 0) / s.weight for s in self._active]
+            if sum(shares):
+                jain = sum(shares) ** 2 / (len(shares) * sum(x * x for x in shares))
+                self._contended.append((now - self._epoch_start, jain))
+        self._epoch_start = now
+        self._epoch_bytes = {}
+
+    def _may_read_unlimited(self, stream: _Stream) -> bool:
+        """Sin limite: una descarga grande cede el enlace a las chicas (salvo la mas vieja)."""
+        if not any(s.priority == "high" for s in self._active):
+            return True
+        return next(s for s in self._active if s.priority == "low") is stream
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self._current_rate())
+        self.updated = now
+
+    def acquire(self, stream: _Stream, n: int):
+        """Bloquea hasta que este stream pueda leer n bytes."""
+        with self._cond:
+            if not self.rate:
+                while stream.priority == "low" and not self._may_read_unlimited(stream):
+                    self._cond.wait()
+                return
+            self._waiting.append(stream)
+            try:
+                while True:
+                    self._refill()
+                    turn = min(self._waiting, key=lambda s: s.vtime)
+                    if turn is stream and self.tokens >= n:
+                        self.tokens -= n
+                        stream.vtime += n / stream.weight
+                        return
+                    missing = max(0.0, n - self.tokens) / self._current_rate()
+                    self._cond.wait(missing if turn is stream else None)
+            finally:
+                self._waiting.remove(stream)
+                self._cond.notify_all()
+
+    def record(self, stream: _Stream, requested: int, received: int):
+        """Cuenta lo recibido y devuelve los tokens no usados (lectura mas corta)."""
+        with self._cond:
+            stream.bytes += received
+            self._epoch_bytes[stream] = self._epoch_bytes.get(stream, 0) + received
+            if self.rate and received < requested:
+                self.tokens = min(self.capacity, self.tokens + requested - received)
+                stream.vtime -= (requested - received) / stream.weight
+                self._cond.notify_all()
+
+    def chunk_size(self) -> int:
+        return min(CHUNK_SIZE, int(self.capacity)) if self.rate else CHUNK_SIZE
+
+    def stats(self) -> Optional[dict]:
+        """
+        Totales de las descargas terminadas: bytes, duracion, velocidad, utilizacion del
+        limite y equidad: indice de Jain de bytes/peso solo en los tramos donde 2+ descargas
+        compitieron por el limite (promediado por duracion). Sin competencia es None.
+        """
+        done = [s for s in self.streams if s.end is not None and s.bytes]
+        if not done:
+            return None
+        elapsed = max(s.end for s in done) - min(s.start for s in done)
+        total = sum(s.bytes for s in done)
+        contended = sum(seconds for seconds, _ in self._contended)
+        fairness = (round(sum(seconds * jain for seconds, jain in self._contended) / contended, 3)
+                    if contended else None)
+        by_priority = {}
+        for s in done:
+            entry = by_priority.setdefault(s.priority, {"count": 0, "bytes": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["bytes"] += s.bytes
+            entry["seconds"] += s.end - s.start
+        return {
+            "count": len(done),
+            "bytes": total,
+            "seconds": round(elapsed, 2),
+            "bytes_per_sec": total / max(elapsed, 1e-6),
+            "utilization": round(total / max(elapsed, 1e-6) / self.rate, 3) if self.rate else None,
+            "fairness": fairness,
+            "contended_seconds": round(contended, 2),
+            "priorities": by_priority,
+        }
+
+    def report(self, logger):
+        stats = self.stats()
+        if not stats:
+            return
+        mb = 1024 * 1024
+        limit = (f", {stats['utilization'] * 100:.0f}% del limite de {self.limit_kbps()}KB/s"
+                 if stats["utilization"] is not None else "")
+        fairness = (f", equidad (Jain) {stats['fairness']} en {stats['contended_seconds']}s con competencia"
+                    if stats["fairness"] is not None else "")
+        logger.info(f"Descargas: {stats['count']} archivos, {stats['bytes'] / mb:.1f}MB en {stats['seconds']}s "
+                    f"({stats['bytes_per_sec'] / mb:.2f}MB/s{limit}){fairness}")
+        for priority in PRIORITY_WEIGHTS:
+            entry = stats["priorities"].get(priority)
+            if entry:
+                print(f"    {priority:<8}{entry['count']:>4} archivos{entry['bytes'] / mb:>10.1f}MB"
+                      f"{entry['seconds'] / entry['count']:>8.1f}s promedio")
+
+# Planificador compartido por todas las descargas del proceso
+SCHEDULER = DownloadScheduler()
+
+def fetch(url: str, dest: Path, headers: Optional[Dict[str, str]] = None, timeout: float = 60,
+          cancel: Optional[threading.Event] = None, priority: Optional[str] = None,
+          scheduler: Optional[DownloadScheduler] = None) -> dict:
+    """
+    Descarga url -> dest calculando el sha256 mientras se escribe.
+    Escribe primero a '<dest>.part' para no dejar archivos a medias (si falla o se
+    cancela, el parcial se borra). Si 'cancel' se activa lanza DownloadCancelled.
+    Pasa por el planificador (SCHEDULER): sin 'priority' se decide por el tamaño.
+    """
+    scheduler = scheduler or SCHEDULER
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".part")
+    req = urllib.request.Request(url, headers=dict({"User-Agent": USER_AGENT}, **(headers or {})))
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response, open(tmp, "wb") as f:
+            length = response.headers.get("Content-Length")
+            stream = scheduler.open(dest.name, int(length) if length else None, priority)
+            try:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise DownloadCancelled(url)
+                    n = scheduler.chunk_size()
+                    scheduler.acquire(stream, n)
+                    chunk = response.read(n)
+                    scheduler.record(stream, n, len(chunk))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            finally:
+                scheduler.close(stream)
+        tmp.replace(dest)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return {"size": size, "sha256": digest.hexdigest()}
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
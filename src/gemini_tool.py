@@ -1,5 +1,11 @@
 import sys
 import os
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import google.generativeai as genai # type: ignore
 
 # Tu zshrc debe exportar esta variable
@@ -35,11 +41,119 @@ if os.path.exists(context_path):
     except:
         pass
 
-genai.configure(api_key=api_key)
+# GEMINI_API_ENDPOINT permite apuntar a un servidor local que imite la API REST (pruebas)
+api_endpoint = os.getenv("GEMINI_API_ENDPOINT")
+if api_endpoint:
+    genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": api_endpoint})
+else:
+    genai.configure(api_key=api_key)
 model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=system_instruction)
 
+# ==========================================
+# MODO LOTE (gemini --batch)
+# ==========================================
+
+MAX_ATTEMPTS = 5
+BASE_BACKOFF = 1.0  # segundos, se duplica en cada reintento
+
+class RateLimiter:
+    """Pausa compartida: si un worker recibe 429, todos esperan antes del proximo envio."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cooldown_until = 0.0
+
+    def wait(self):
+        with self.lock:
+            delay = self.cooldown_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def backoff(self, seconds):
+        with self.lock:
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+def is_retryable(error):
+    from google.api_core import exceptions as gexc # type: ignore
+    return isinstance(error, (gexc.ResourceExhausted, gexc.ServiceUnavailable,
+                              gexc.InternalServerError, gexc.DeadlineExceeded))
+
+def read_prompts(source):
+    """
+    Un prompt por linea. Tambien acepta JSONL: {"id": ..., "prompt": ...}
+    Una linea que empieza con '{' pero no es JSON valido se toma como texto.
+    Devuelve (prompts, errores): un objeto sin "prompt" es un error {"id", "error"}.
+    """
+    prompts, errors = [], []
+    for number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        item = None
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except ValueError:
+                pass
+        if not isinstance(item, dict):
+            prompts.append((number, line))
+        elif isinstance(item.get("prompt"), str) and item["prompt"].strip():
+            prompts.append((item.get("id", number), item["prompt"]))
+        else:
+            errors.append({"id": item.get("id", number), "error": f"linea {number}: falta \"prompt\""})
+    return prompts, errors
+
+def run_prompt(item_id, prompt, limiter):
+    start = time.monotonic()
+    result = {"id": item_id, "prompt": prompt}
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        limiter.wait()
+        try:
+            result["response"] = model.generate_content(prompt).text
+            break
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS or not is_retryable(e):
+                result["error"] = str(e)
+                break
+            # Backoff exponencial con jitter, compartido por todos los workers
+            limiter.backoff(BASE_BACKOFF * (2 ** (attempt - 1)) + random.uniform(0, 0.5))
+    result["attempts"] = attempt
+    result["latency_ms"] = int((time.monotonic() - start) * 1000)
+    return result
+
+def run_batch(argv):
+    parser = argparse.ArgumentParser(prog="gemini --batch", description="Procesa muchos prompts en paralelo")
+    parser.add_argument("file", nargs="?", help="Archivo de prompts (default: stdin)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4, help="Pedidos simultaneos")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file, "r") as f:
+            prompts, errors = read_prompts(f)
+    else:
+        prompts, errors = read_prompts(sys.stdin)
+
+    # Las lineas invalidas salen como error sin frenar el resto del lote
+    for error in errors:
+        print(json.dumps(error, ensure_ascii=False), flush=True)
+
+    limiter = RateLimiter()
+    failed = len(errors)
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = [pool.submit(run_prompt, item_id, prompt, limiter) for item_id, prompt in prompts]
+        # Salida JSONL en orden de finalizacion, una linea por resultado
+        for future in as_completed(futures):
+            result = future.result()
+            failed += "error" in result
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    sys.exit(1 if failed else 0)
+
+# MODO 3: Lote (gemini --batch [archivo] [-j N])
+if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+    run_batch(sys.argv[2:])
+
 # MODO 1: Comando directo (gemini: "pregunta")
-if len(sys.argv) > 1:
+elif len(sys.argv) > 1:
     prompt = " ".join(sys.argv[1:])
     try:
         response = model.generate_content(prompt)
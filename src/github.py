@@ -0,0 +1,96 @@
+import json
+import platform
+import re
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .downloads import fetch
+
+# ==========================================
+# RELEASES DE GITHUB (binarios de Paquetes Extra)
+# ==========================================
+
+# Herramientas que se instalan desde el ultimo release de GitHub
+# keyword: texto que debe aparecer en el nombre del asset
+# binary: nombre del ejecutable dentro del archivo (o del asset si no es tarball)
+GITHUB_TOOLS = {
+    "eza": {"repo": "eza-community/eza", "keyword": ".tar.gz", "binary": "eza"},
+    "bat": {"repo": "sharkdp/bat", "keyword": ".tar.gz", "binary": "bat"},
+    "fzf": {"repo": "junegunn/fzf", "keyword": ".tar.gz", "binary": "fzf"},
+    "tldr": {"repo": "dbrgn/tealdeer", "keyword": "linux", "binary": "tldr", "allow_musl": True},
+    "starship": {"repo": "starship/starship", "keyword": ".tar.gz", "binary": "starship", "allow_musl": True},
+    "zoxide": {"repo": "ajeetdsouza/zoxide", "keyword": ".tar.gz", "binary": "zoxide", "allow_musl": True},
+}
+
+# Consultas a la API y a los .sha256: sin timeout un hilo puede quedar colgado para siempre
+API_TIMEOUT = 30
+
+# Archivos auxiliares que acompañan a los assets (no son el binario)
+SIDECAR_SUFFIXES = (".sha256", ".sha256sum", ".sig", ".asc", ".minisig", ".sbom", ".txt")
+
+def get_arch_terms(arch: Optional[str] = None) -> List[str]:
+    arch = (arch or platform.machine()).lower()
+    if arch in ["x86_64", "amd64"]: return ["x86_64", "amd64"]
+    if arch in ["aarch64", "arm64"]: return ["aarch64", "arm64"]
+    return [arch]
+
+def parse_version(text: str) -> Optional[Tuple[int, ...]]:
+    """Primer 'X.Y[.Z]' del texto: 'v0.18.0', 'bat 0.24' -> (0, 24, 0)"""
+    match = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?", text or "")
+    if not match:
+        return None
+    return tuple(int(x or 0) for x in match.groups())
+
+def get_latest_release(repo: str) -> dict:
+    api_url = f"https://api.github.com/repos/{repo}/releases/latest"
+    req = urllib.request.Request(api_url, headers={'User-Agent': 'python'})
+    with urllib.request.urlopen(req, timeout=API_TIMEOUT) as response:
+        return json.loads(response.read().decode())
+
+def find_asset(release: dict, keyword: str, arch: Optional[str] = None, allow_musl: bool = False) -> Optional[dict]:
+    """Primer asset Linux que coincide con la arquitectura y el keyword."""
+    arch_terms = get_arch_terms(arch)
+    for asset in release.get("assets", []):
+        name = asset["name"].lower()
+        if name.endswith(SIDECAR_SUFFIXES): continue
+        if "linux" not in name and "unknown-linux" not in name: continue
+        if not any(term in name for term in arch_terms): continue
+        if keyword and keyword not in name: continue
+        if "musl" in name and not allow_musl: continue
+        return asset
+    return None
+
+def asset_checksum(release: dict, asset: dict) -> Optional[str]:
+    """
+    sha256 publicado para el asset: campo 'digest' de la API de GitHub
+    o, si no esta, el archivo '<asset>.sha256' del mismo release.
+    """
+    digest = asset.get("digest") or ""
+    if digest.startswith("sha256:"):
+        return digest.split(":", 1)[1]
+    for other in release.get("assets", []):
+        if other["name"] == asset["name"] + ".sha256":
+            req = urllib.request.Request(other["browser_download_url"], headers={'User-Agent': 'python'})
+            with urllib.request.urlopen(req, timeout=API_TIMEOUT) as response:
+                return response.read().decode().split()[0].lower()
+    return None
+
+def download_tool(tool: str, dest_dir: Path, arch: Optional[str] = None,
+                  release: Optional[dict] = None, cancel=None) -> Optional[Path]:
+    """
+    Baja el asset de una herramienta de GITHUB_TOOLS y verifica su sha256.
+    Devuelve la ruta del archivo o None si no hay asset para la arquitectura.
+    """
+    spec = GITHUB_TOOLS[tool]
+    release = release or get_latest_release(spec["repo"])
+    asset = find_asset(release, spec["keyword"], arch, spec.get("allow_musl", False))
+    if not asset:
+        return None
+    dest = Path(dest_dir) / asset["name"]
+    info = fetch(asset["browser_download_url"], dest, cancel=cancel)
+    expected = asset_checksum(release, asset)
+    if expected and expected != info["sha256"]:
+        dest.unlink()
+        raise ValueError(f"sha256 no coincide para {asset['name']}")
+    return dest
@@ -0,0 +1,79 @@
+import os
+import platform
+from typing import Dict, Set
+
+# ==========================================
+# DETECCION DE HARDWARE DEL HOST
+# ==========================================
+
+def _read_meminfo() -> Dict[str, int]:
+    """Lee /proc/meminfo y devuelve los valores en kB."""
+    info = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = int(value.split()[0])
+    except (OSError, ValueError):
+        pass
+    return info
+
+def _read_cpu_flags() -> Set[str]:
+    """Flags de la CPU (avx, avx2 en x86 / asimd en ARM)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key = line.split(":", 1)[0].strip().lower()
+                if key in ("flags", "features"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+def _count_physical_cores() -> int:
+    """Cuenta nucleos fisicos (sin hyperthreading). Fallback: os.cpu_count()."""
+    cores = set()
+    physical_id = core_id = None
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if ":" not in line:
+                    if core_id is not None:
+                        cores.add((physical_id, core_id))
+                    physical_id = core_id = None
+                    continue
+                key, value = [x.strip() for x in line.split(":", 1)]
+                if key == "physical id": physical_id = value
+                elif key == "core id": core_id = value
+        if core_id is not None:
+            cores.add((physical_id, core_id))
+    except OSError:
+        pass
+    return len(cores) or os.cpu_count() or 1
+
+def detect_host() -> dict:
+    """
+    Devuelve los datos del host que importan para correr modelos locales:
+    arquitectura, CPUs logicas, nucleos fisicos, memoria (MB) y soporte SIMD.
+    """
+    mem = _read_meminfo()
+    flags = _read_cpu_flags()
+    return {
+        "arch": platform.machine().lower(),
+        "cpus": os.cpu_count() or 1,
+        "cores": _count_physical_cores(),
+        "mem_total_mb": mem.get("MemTotal", 0) // 1024,
+        "mem_available_mb": mem.get("MemAvailable", mem.get("MemFree", 0)) // 1024,
+        "avx": "avx" in flags,
+        "avx2": "avx2" in flags,
+        # AVX2 en x86 o NEON (asimd) en ARM: sin esto la inferencia en CPU es muy lenta
+        "simd": "avx2" in flags or "asimd" in flags,
+    }
+
+def detect_container() -> bool:
+    """
+    True solo en contenedores claramente efimeros (Docker: /.dockerenv).
+    Toolbox/distrobox (/run/.containerenv), LXC o $container suelen ser entornos
+    de trabajo persistentes: ahi el modo contenedor se activa a mano desde el perfil.
+    """
+    return os.path.exists("/.dockerenv")
@@ -1,7 +1,17 @@
-from .debian import DebianManager
-from .alpine import AlpineManager
-from .fedora import FedoraManager
-
-# Esto permite importar las clases directamente desde el paquete managers
+# Importacion diferida (PEP 562): cada backend se carga recien cuando se pide,
+# asi "import src.managers" no arrastra los tres (ni sus dependencias de red).
 # Ejemplo: from src.managers import DebianManager
-__all__ = ["DebianManager", "AlpineManager", "FedoraManager"]
\ No newline at end of file
+import importlib
+
+_BACKENDS = {
+    "DebianManager": ".debian",
+    "AlpineManager": ".alpine",
+    "FedoraManager": ".fedora",
+}
+
+def __getattr__(name):
+    if name in _BACKENDS:
+        return getattr(importlib.import_module(_BACKENDS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["DebianManager", "AlpineManager", "FedoraManager"]
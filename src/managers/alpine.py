@@ -1,4 +1,5 @@
 import subprocess
+from pathlib import Path
 from typing import List
 from ..core import PackageManager
 
@@ -15,15 +16,41 @@ class AlpineManager(PackageManager):
     def install(self, packages: List[str]):
         # Traducir nombres usando el diccionario Rosetta del core
         mapped_packages = [self._get_mapped_name(p) for p in packages]
+
+        # Modo offline: paquetes descargados previamente en el bundle
+        if self.bundle:
+            if self.bundle.package_dir():
+                self.install_local(self.bundle.package_dir(), mapped_packages)
+            else:
+                print("[Error] El bundle no trae paquetes de la distro; se omite APK (modo offline, sin red).")
+            return
         
         print(f"[Alpine] Instalando paquetes: {', '.join(mapped_packages)}")
         
         # En Alpine usamos --no-cache para no guardar los indices en disco
         # y mantener el sistema lo mas ligero posible.
         cmd = ["sudo", "apk", "add", "--no-cache"] + mapped_packages
+        if self.container_mode:
+            # APK ya no instala docs (-doc son paquetes aparte); solo evitamos la barra de progreso
+            cmd.insert(3, "--no-progress")
         
         try:
             subprocess.run(cmd, check=True)
         except subprocess.CalledProcessError:
             print("[Error] Fallo la instalacion con APK.")
-            raise
\ No newline at end of file
+            raise
+
+    def download(self, packages: List[str], dest: str):
+        mapped_packages = [self._get_mapped_name(p) for p in packages]
+        print(f"[Alpine] Descargando (sin instalar): {', '.join(mapped_packages)}")
+        subprocess.run(["apk", "fetch", "--recursive", "--output", dest] + mapped_packages, check=True)
+
+    def install_local(self, pool: str, packages: List[str]):
+        # Sin APKINDEX firmado apk no acepta el directorio como repositorio: van los archivos
+        files = [str(p) for p in sorted(Path(pool).glob("*.apk"))]
+        print(f"[Alpine] Instalando {len(files)} paquetes locales...")
+        try:
+            subprocess.run(["sudo", "apk", "add", "--no-network", "--no-cache"] + files, check=True)
+        except subprocess.CalledProcessError:
+            print("[Error] Fallo la instalacion local con APK.")
+            raise
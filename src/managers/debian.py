@@ -1,20 +1,55 @@
 import subprocess
 import os
+import re
 import shutil
-import json
-import urllib.request
-import platform
+import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
-from ..core import PackageManager
+from typing import List, Optional
+from ..core import PackageManager, dir_size, parse_size
+from ..downloads import SCHEDULER, sha256_file
+from ..github import GITHUB_TOOLS, download_tool, get_latest_release, parse_version
+
+# Destino de los binarios bajados de GitHub
+INSTALL_DIR = "/usr/local/bin"
+# Serializa los reemplazos con sudo de upgrade_binaries (corre en varios hilos)
+PLACE_LOCK = threading.Lock()
+
+# Modo contenedor: dpkg sin fsync y sin docs/man/locales (igual que las imagenes -slim).
+# Van como opciones de esta llamada, no en /etc/dpkg: los apt install posteriores no cambian.
+DPKG_CONTAINER_OPTIONS = [
+    "--force-unsafe-io",
+    "--path-exclude=/usr/share/doc/*",
+    "--path-include=/usr/share/doc/*/copyright",
+    "--path-exclude=/usr/share/man/*",
+    "--path-exclude=/usr/share/info/*",
+    "--path-exclude=/usr/share/locale/*",
+    "--path-include=/usr/share/locale/locale.alias",
+]
+APT_CONTAINER_FLAGS = ["--no-install-recommends", "-o", "APT::Keep-Downloaded-Packages=false"]
+for _opt in DPKG_CONTAINER_OPTIONS:
+    APT_CONTAINER_FLAGS += ["-o", f"DPkg::Options::={_opt}"]
+
+def _write_packages_index(pool: Path, repo: Path):
+    """Repositorio plano en 'repo': symlinks a los .deb del pool + indice Packages (via dpkg-deb)."""
+    stanzas = []
+    for deb in sorted(pool.glob("*.deb")):
+        (repo / deb.name).symlink_to(deb.resolve())
+        control = subprocess.run(["dpkg-deb", "-f", str(deb)], stdout=subprocess.PIPE, check=True).stdout.decode()
+        stanzas.append(control.rstrip("\n") + f"\nFilename: ./{deb.name}\nSize: {deb.stat().st_size}"
+                       f"\nSHA256: {sha256_file(deb)}\n")
+    (repo / "Packages").write_text("\n".join(stanzas))
 
 class DebianManager(PackageManager):
     def update(self):
         print("[Debian] Ejecutando actualización completa del sistema...")
         try:
             # sudo apt update && sudo apt upgrade -y && sudo apt autoremove -y
-            subprocess.run(self.sudo_cmd + ["apt", "update"], check=True)
-            subprocess.run(self.sudo_cmd + ["apt", "upgrade", "-y"], check=True)
+            subprocess.run(self.sudo_cmd + ["apt", "update"] + self._limit_opts(), check=True)
+            subprocess.run(self.sudo_cmd + ["apt", "upgrade", "-y"] + self._limit_opts(), check=True)
             subprocess.run(self.sudo_cmd + ["apt", "autoremove", "-y"], check=True)
             # Actualizamos pip aqui para evitar warnings al final
             print("[Debian] Actualizando pip...")
@@ -22,12 +57,20 @@ class DebianManager(PackageManager):
         except subprocess.CalledProcessError:
             print("[Error] Falló la actualización. Continuando bajo su propio riesgo...")
 
-    def install(self, packages: List[str]):
+    def _limit_opts(self) -> List[str]:
+        """Limite del planificador de descargas para apt (Dl-Limit, en KB/s)."""
+        kbps = SCHEDULER.external_limit_kbps()
+        if not kbps:
+            return []
+        return ["-o", f"Acquire::http::Dl-Limit={kbps}", "-o", f"Acquire::https::Dl-Limit={kbps}"]
+
+    def _split_packages(self, packages: List[str]):
+        """Separa paquetes de APT y herramientas que se bajan de GitHub."""
         apt_packages = []
         manual_packages = []
         
         # Mapeo de herramientas modernas a instalación manual
-        modern_tools = ["eza", "bat", "fzf", "starship", "zoxide", "tldr"]
+        modern_tools = list(GITHUB_TOOLS)
 
         for pkg in packages:
             # Mapeamos nombre generico a nombre de distro
@@ -39,99 +82,259 @@ class DebianManager(PackageManager):
             else:
                 apt_packages.append(mapped)
 
-        # 1. APT (Base)
         if apt_packages:
             # Agregamos python3-venv para Gemini
             extras = ["curl", "wget", "tar", "unzip", "python3-venv"] 
-            to_install = list(set(apt_packages + extras))
-            print(f"[APT] Instalando: {', '.join(to_install)}")
+            apt_packages = list(set(apt_packages + extras))
+        return apt_packages, manual_packages
+
+    def install(self, packages: List[str]):
+        apt_packages, manual_packages = self._split_packages(packages)
+
+        if apt_packages and self.container_mode:
+            print("[APT] Modo contenedor: sin fsync, sin recomendados ni documentacion.")
+
+        # 1. APT (Base)
+        if apt_packages and self.bundle:
+            if self.bundle.package_dir():
+                self.install_local(self.bundle.package_dir(), apt_packages)
+            else:
+                print("[Error] El bundle no trae paquetes de la distro; se omite APT (modo offline, sin red).")
+        elif apt_packages:
+            print(f"[APT] Instalando: {', '.join(apt_packages)}")
+            flags = (APT_CONTAINER_FLAGS if self.container_mode else []) + self._limit_opts()
             try:
-                subprocess.run(self.sudo_cmd + ["apt", "install", "-y"] + to_install, check=True)
+                subprocess.run(self.sudo_cmd + ["apt", "install", "-y"] + flags + apt_packages, check=True)
             except subprocess.CalledProcessError:
                 print("[Error] Fallo APT.")
 
+        if apt_packages and self.container_mode:
+            self._clean_container()
+
         # 2. Binarios GitHub (Extra)
         for tool in manual_packages:
             self._install_binary(tool)
     
-    def _get_arch_terms(self):
-        arch = platform.machine().lower()
-        if arch == "x86_64": return ["x86_64", "amd64"]
-        if arch in ["aarch64", "arm64"]: return ["aarch64", "arm64"]
-        return [arch]
-
-    def _download_github_asset(self, repo, keyword, output_name, allow_musl=False):
-        print(f"⬇️  [GitHub] Buscando {output_name} en {repo}...")
+    def _clean_container(self):
+        # Cache de .deb: en un contenedor solo ocupa espacio
+        subprocess.run(self.sudo_cmd + ["apt-get", "clean"], check=False)
+        # Los indices solo con container_mode: true explicito (sin ellos apt install falla hasta un apt update)
+        if self.clean_indexes:
+            subprocess.run(self.sudo_cmd + ["sh", "-c", "rm -rf /var/lib/apt/lists/*"], check=False)
+
+    def download(self, packages: List[str], dest: str):
+        apt_packages, _ = self._split_packages(packages)
+        if not apt_packages:
+            return
+        print(f"[APT] Descargando (sin instalar): {', '.join(apt_packages)}")
+        # Clausura completa de dependencias: 'install --download-only' omite lo que ya
+        # esta instalado en el host y el equipo aislado quedaria con dependencias rotas.
+        # Es solo un pool: install_local deja que apt elija de ahi lo que falte
+        res = subprocess.run(
+            ["apt-cache", "depends", "--recurse", "--no-recommends", "--no-suggests", "--no-conflicts",
+             "--no-breaks", "--no-replaces", "--no-enhances"] + apt_packages,
+            stdout=subprocess.PIPE, check=True
+        )
+        closure = sorted({
+            line.strip() for line in res.stdout.decode().splitlines()
+            # Solo nombres reales: sin lineas de dependencia, virtuales (<pkg>) ni otras arquitecturas
+            if line and not line[0].isspace() and not line.startswith("<") and ":" not in line
+        })
+        Path(dest).mkdir(parents=True, exist_ok=True)
+        # 'apt-get download' no necesita root y deja los .deb en el directorio actual
+        subprocess.run(["apt-get", "download"] + self._limit_opts() + closure, cwd=dest, check=True)
+
+    def prefetch_commands(self, packages: List[str]) -> List[List[str]]:
+        apt_packages, _ = self._split_packages(packages)
+        if not apt_packages:
+            return []
+        # sudo -n: si pide contraseña falla en vez de romper el menu
+        sudo = self.sudo_cmd + ["-n"] if self.sudo_cmd else []
+        flags = (APT_CONTAINER_FLAGS if self.container_mode else []) + self._limit_opts()
+        return [
+            sudo + ["apt-get", "update", "-qq"] + self._limit_opts(),
+            sudo + ["apt-get", "install", "-y", "-qq", "--download-only"] + flags + apt_packages,
+        ]
+
+    def estimate_download(self, packages: List[str]) -> Optional[dict]:
+        """Tamaño exacto de los .deb faltantes (--print-uris) y el espacio que informa apt."""
+        apt_packages, _ = self._split_packages(packages)
+        if not apt_packages:
+            return {"download": 0, "disk": 0}
+        flags = APT_CONTAINER_FLAGS if self.container_mode else []
         try:
-            api_url = f"https://api.github.com/repos/{repo}/releases/latest"
-            req = urllib.request.Request(api_url, headers={'User-Agent': 'python'})
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode())
-            
-            arch_terms = self._get_arch_terms()
-            download_url = None
-            
-            for asset in data["assets"]:
-                name = asset["name"].lower()
-                if "linux" not in name and "unknown-linux" not in name: continue
-                if not any(term in name for term in arch_terms): continue
-                if keyword and keyword not in name: continue
-                if "musl" in name and not allow_musl: continue
-                download_url = asset["browser_download_url"]
-                break
-            
-            if not download_url: return False
-            subprocess.run(["curl", "-L", "-o", output_name, download_url], check=True)
-            return True
-        except: return False
+            res = subprocess.run(
+                self.sudo_cmd + ["apt-get", "install", "-y", "--print-uris"] + flags + apt_packages,
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=dict(os.environ, LC_ALL="C"),
+                timeout=120
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if res.returncode != 0:
+            return None
+        output = res.stdout.decode(errors="ignore")
+        # Cada .deb a bajar: 'URL' archivo.deb TAMAÑO SHA256:...
+        download = sum(int(m.group(1)) for m in re.finditer(r"^'\S+' \S+ (\d+) ", output, flags=re.M))
+        match = re.search(r"After this operation, ([\d.,]+ \w+) of additional disk space", output)
+        disk = parse_size(match.group(1)) if match else 0
+        return {"download": download, "disk": download + disk}
+
+    def footprint(self) -> Optional[dict]:
+        try:
+            res = subprocess.run(["dpkg-query", "-Wf", "${Installed-Size}\n"], stdout=subprocess.PIPE, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        # Installed-Size viene en KiB
+        kib = sum(int(x) for x in res.stdout.decode().split() if x.isdigit())
+        return {"installed": kib * 1024, "cache": dir_size("/var/cache/apt")}
+
+    def install_local(self, pool: str, packages: List[str]):
+        """
+        El pool del bundle se usa como repositorio 'file:' aislado (indices propios en un
+        directorio temporal): apt instala solo lo pedido + las dependencias que faltan,
+        las marca como automaticas y no baja de version lo que el host ya tiene mas nuevo.
+        """
+        print(f"[APT] Instalando desde el bundle: {', '.join(packages)}")
+        state = Path(tempfile.mkdtemp(prefix="brainbash_apt_"))
+        try:
+            os.chmod(str(state), 0o755)
+            repo = state / "repo"
+            repo.mkdir()
+            (state / "lists" / "partial").mkdir(parents=True)
+            _write_packages_index(Path(pool), repo)
+            sources = state / "sources.list"
+            sources.write_text(f"deb [trusted=yes] file:{repo} ./\n")
+            # Solo este repositorio y sin tocar los indices ni la cache del sistema
+            opts = ["-o", f"Dir::Etc::SourceList={sources}", "-o", "Dir::Etc::SourceParts=-",
+                    "-o", f"Dir::State::Lists={state / 'lists'}",
+                    "-o", "Dir::Cache::pkgcache=", "-o", "Dir::Cache::srcpkgcache="]
+            flags = APT_CONTAINER_FLAGS if self.container_mode else []
+            subprocess.run(self.sudo_cmd + ["apt-get", "update", "-qq"] + opts, check=True)
+            subprocess.run(self.sudo_cmd + ["apt-get", "install", "-y"] + flags + opts + packages, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"[Error] Fallo APT (local): {e}")
+        finally:
+            shutil.rmtree(state, ignore_errors=True)
 
     def _install_binary(self, tool):
         if shutil.which(tool):
             print(f"[Skip] {tool} ya está instalado.")
             return
             
+        # Modo offline: el asset ya viene dentro del bundle
+        bundled = self.bundle.github_asset(tool) if self.bundle else None
+        # O ya descargado mientras se usaba el menu
+        if not bundled and self.prefetch:
+            bundled = self.prefetch.github_asset(tool)
+        if bundled:
+            self._install_archive(tool, bundled)
+            return
+        if self.bundle:
+            print(f"[Error] {tool} no esta en el bundle; se omite (modo offline, sin red).")
+            return
+
+        # Mismo camino para todas: un asset del release + sha256 + instalacion en proceso
+        print(f"⬇️  [GitHub] Buscando {tool} en {GITHUB_TOOLS[tool]['repo']}...")
+        temp_dir = Path(tempfile.mkdtemp(prefix="brainbash_dl_"))
+        try:
+            asset = download_tool(tool, temp_dir)
+            if not asset:
+                print(f"[Error] No hay release de {tool} para esta arquitectura.")
+                return
+            self._install_archive(tool, asset)
+        except Exception as e:
+            print(f"Error {tool}: {e}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _install_archive(self, tool, archive_path) -> bool:
+        """Instala un binario desde un asset local (tarball o ejecutable suelto). True si quedo instalado."""
         print(f"[Binario] Instalando {tool}...")
-        original_cwd = os.getcwd()
-        temp_dir = Path("/tmp/brainbash_bin")
-        if temp_dir.exists(): shutil.rmtree(temp_dir)
-        temp_dir.mkdir(exist_ok=True)
-        
-        sudo_prefix = " ".join(self.sudo_cmd)
-        
+        binary = GITHUB_TOOLS[tool]["binary"]
+        temp_dir = Path(tempfile.mkdtemp(prefix="brainbash_bin_"))
         try:
-            os.chdir(temp_dir)
-            
-            if tool == "eza":
-                if self._download_github_asset("eza-community/eza", ".tar.gz", "eza.tar.gz"):
-                    subprocess.run("tar -xzf eza.tar.gz", shell=True)
-                    subprocess.run(f"{sudo_prefix} mv ./eza /usr/local/bin/", shell=True)
-                    subprocess.run(f"{sudo_prefix} chmod +x /usr/local/bin/eza", shell=True)
-            elif tool == "bat":
-                if self._download_github_asset("sharkdp/bat", ".tar.gz", "bat.tar.gz"):
-                    subprocess.run("tar -xzf bat.tar.gz", shell=True)
-                    subprocess.run(f"{sudo_prefix} mv bat-*/bat /usr/local/bin/", shell=True)
-                    subprocess.run(f"{sudo_prefix} chmod +x /usr/local/bin/bat", shell=True)
-            elif tool == "fzf":
-                if self._download_github_asset("junegunn/fzf", ".tar.gz", "fzf.tar.gz"):
-                    subprocess.run("tar -xzf fzf.tar.gz", shell=True)
-                    subprocess.run(f"{sudo_prefix} mv fzf /usr/local/bin/", shell=True)
-                    subprocess.run(f"{sudo_prefix} chmod +x /usr/local/bin/fzf", shell=True)
-            elif tool == "tldr":
-                if self._download_github_asset("dbrgn/tealdeer", "linux", "tldr", allow_musl=True):
-                    subprocess.run("chmod +x tldr", shell=True)
-                    subprocess.run(f"{sudo_prefix} mv tldr /usr/local/bin/", shell=True)
-            elif tool == "starship":
-                subprocess.run("curl -sS https://starship.rs/install.sh | sh -s -- -y", shell=True)
-            elif tool == "zoxide":
-                subprocess.run("curl -sS https://raw.githubusercontent.com/ajeetdsouza/zoxide/main/install.sh | sh -s -- --bin-dir /usr/local/bin", shell=True)
-            
+            if tarfile.is_tarfile(str(archive_path)):
+                with tarfile.open(archive_path) as tar:
+                    # Solo extraemos el ejecutable, no docs/completions
+                    member = next((m for m in tar.getmembers()
+                                   if m.isfile() and Path(m.name).name == binary), None)
+                    if member is None:
+                        print(f"[Error] {binary} no encontrado dentro de {archive_path}")
+                        return False
+                    source = temp_dir / binary
+                    with tar.extractfile(member) as src, open(source, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+            else:
+                source = Path(archive_path)
+            self._place_binary(source, Path(INSTALL_DIR) / binary)
             print(f"{tool} instalado.")
+            return True
         except Exception as e:
             print(f"Error {tool}: {e}")
+            return False
         finally:
-            os.chdir(original_cwd)
             shutil.rmtree(temp_dir, ignore_errors=True)
 
+    def _place_binary(self, source: Path, dest: Path):
+        """Copia atomica (tmp + rename) al destino; sudo solo si no hay permisos."""
+        tmp = dest.with_name(f".{dest.name}.tmp")
+        if os.access(str(dest.parent), os.W_OK):
+            shutil.copyfile(str(source), str(tmp))
+            os.chmod(str(tmp), 0o755)
+            os.replace(str(tmp), str(dest))
+        else:
+            # De a uno: con varias actualizaciones en paralelo, sudo pediria la clave a la vez
+            with PLACE_LOCK:
+                # Un binario en uso nunca queda a medio escribir: install a tmp y mv (rename)
+                subprocess.run(self.sudo_cmd + ["install", "-m", "755", str(source), str(tmp)], check=True)
+                subprocess.run(self.sudo_cmd + ["mv", "-f", str(tmp), str(dest)], check=True)
+
+    # ==========================================
+    # ACTUALIZACION DE BINARIOS DE GITHUB
+    # ==========================================
+
+    def _local_version(self, binary: str):
+        try:
+            res = subprocess.run([str(Path(INSTALL_DIR) / binary), "--version"],
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=10)
+            return parse_version(res.stdout.decode(errors="ignore"))
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _upgrade_one(self, tool: str) -> dict:
+        start = time.monotonic()
+        binary = GITHUB_TOOLS[tool]["binary"]
+        result = {"tool": tool, "local": self._local_version(binary), "latest": None, "status": "error"}
+        temp_dir = Path(tempfile.mkdtemp(prefix="brainbash_up_"))
+        try:
+            release = get_latest_release(GITHUB_TOOLS[tool]["repo"])
+            result["latest"] = parse_version(release.get("tag_name", ""))
+            if result["local"] and result["latest"] and result["local"] >= result["latest"]:
+                result["status"] = "al dia"
+                return result
+            asset = download_tool(tool, temp_dir, release=release)
+            if asset and self._install_archive(tool, asset):
+                result["status"] = "actualizado"
+        except Exception as e:
+            print(f"Error {tool}: {e}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            result["seconds"] = round(time.monotonic() - start, 2)
+        return result
+
+    def upgrade_binaries(self, tools: List[str], jobs: int = 4) -> List[dict]:
+        """
+        Compara la version local de cada binario de /usr/local/bin con el ultimo
+        release y reemplaza solo los desactualizados, en paralelo.
+        Los instalados por APT (fuera de /usr/local/bin) no se tocan.
+        """
+        managed = [t for t in tools if (Path(INSTALL_DIR) / GITHUB_TOOLS[t]["binary"]).exists()]
+        # La clave de sudo se pide una sola vez, antes de que arranquen los hilos
+        if managed and self.sudo_cmd and not os.access(INSTALL_DIR, os.W_OK):
+            subprocess.run(self.sudo_cmd + ["-v"], check=False)
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            return list(pool.map(self._upgrade_one, managed))
+
 if __name__ == "__main__":
     manager = DebianManager("debian")
     manager.update()
\ No newline at end of file
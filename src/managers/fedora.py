@@ -1,6 +1,18 @@
+import os
+import re
+import shutil
 import subprocess
-from typing import List
-from ..core import PackageManager
+from typing import List, Optional
+from ..core import PackageManager, dir_size, parse_size
+from ..downloads import SCHEDULER
+
+# Modo contenedor: sin dependencias debiles, sin docs y sin guardar paquetes
+DNF_CONTAINER_FLAGS = ["--setopt=install_weak_deps=False", "--setopt=tsflags=nodocs", "--setopt=keepcache=False"]
+
+def _throttle_flags() -> List[str]:
+    """Limite del planificador de descargas para dnf (throttle, en KB/s)."""
+    kbps = SCHEDULER.external_limit_kbps()
+    return [f"--setopt=throttle={kbps}k"] if kbps else []
 
 class FedoraManager(PackageManager):
     """
@@ -14,14 +26,95 @@ class FedoraManager(PackageManager):
 
     def install(self, packages: List[str]):
         mapped_packages = [self._get_mapped_name(p) for p in packages]
+
+        # Modo offline: paquetes descargados previamente en el bundle
+        if self.bundle:
+            if self.bundle.package_dir():
+                self.install_local(self.bundle.package_dir(), mapped_packages)
+            else:
+                print("[Error] El bundle no trae paquetes de la distro; se omite DNF (modo offline, sin red).")
+            return
         
         print(f"[Fedora] Instalando: {', '.join(mapped_packages)}")
         
+        flags = (DNF_CONTAINER_FLAGS if self.container_mode else []) + _throttle_flags()
         try:
             subprocess.run(
-                ["sudo", "dnf", "install", "-y"] + mapped_packages, 
+                ["sudo", "dnf", "install", "-y"] + flags + mapped_packages, 
                 check=True
             )
         except subprocess.CalledProcessError:
             print("[Error] Fallo la instalacion con DNF.")
-            raise
\ No newline at end of file
+            raise
+
+        if self.container_mode and self.clean_indexes:
+            print("[Fedora] Modo contenedor: limpiando cache de DNF...")
+            subprocess.run(["sudo", "dnf", "clean", "all"], check=False)
+
+    def download(self, packages: List[str], dest: str):
+        mapped_packages = [self._get_mapped_name(p) for p in packages]
+        print(f"[Fedora] Descargando (sin instalar): {', '.join(mapped_packages)}")
+        # --alldeps: tambien lo que ya esta instalado en el host (el destino puede no tenerlo)
+        subprocess.run(["dnf", "download", "--resolve", "--alldeps", "--destdir", dest] + _throttle_flags()
+                       + mapped_packages, check=True)
+        # repodata/: en el equipo aislado el directorio se usa como repositorio y dnf
+        # elige de ahi solo las dependencias que falten
+        if not shutil.which("createrepo_c"):
+            raise RuntimeError("falta createrepo_c (sudo dnf install createrepo_c) para indexar los paquetes")
+        subprocess.run(["createrepo_c", "-q", dest], check=True)
+
+    def prefetch_commands(self, packages: List[str]) -> List[List[str]]:
+        # --downloadonly deja los rpm en la cache de dnf; el install posterior los reusa
+        mapped_packages = [self._get_mapped_name(p) for p in packages]
+        flags = (DNF_CONTAINER_FLAGS if self.container_mode else []) + _throttle_flags()
+        return [
+            ["sudo", "-n", "dnf", "makecache", "-q"],
+            ["sudo", "-n", "dnf", "install", "-y", "-q", "--downloadonly"] + flags + mapped_packages,
+        ]
+
+    def estimate_download(self, packages: List[str]) -> Optional[dict]:
+        """Resumen de la transaccion sin ejecutarla (--assumeno)."""
+        mapped_packages = [self._get_mapped_name(p) for p in packages]
+        flags = DNF_CONTAINER_FLAGS if self.container_mode else []
+        try:
+            res = subprocess.run(
+                ["sudo", "dnf", "install", "--assumeno"] + flags + mapped_packages,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=dict(os.environ, LC_ALL="C"),
+                timeout=300
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        output = res.stdout.decode(errors="ignore")
+        if "Nothing to do" in output:
+            return {"download": 0, "disk": 0}
+        # dnf4: 'Total download size: 12 M' / dnf5: 'Need to download 12 MiB'
+        download = re.search(r"(?:Total download size:|Need to download)\s*([\d.,]+ ?\w+)", output)
+        if not download:
+            return None
+        installed = re.search(r"(?:Installed size:|After this operation,)\s*([\d.,]+ ?\w+)", output)
+        download = parse_size(download.group(1))
+        return {"download": download, "disk": download + (parse_size(installed.group(1)) if installed else 0)}
+
+    def footprint(self) -> Optional[dict]:
+        try:
+            res = subprocess.run(["rpm", "-qa", "--qf", "%{SIZE}\n"], stdout=subprocess.PIPE, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        installed = sum(int(x) for x in res.stdout.decode().split() if x.isdigit())
+        # dnf4 / dnf5
+        return {"installed": installed, "cache": dir_size("/var/cache/dnf") + dir_size("/var/cache/libdnf5")}
+
+    def install_local(self, pool: str, packages: List[str]):
+        """
+        El pool del bundle (con su repodata/) como unico repositorio: dnf instala solo lo
+        pedido + las dependencias que faltan y no baja de version lo que el host ya tiene.
+        """
+        print(f"[Fedora] Instalando desde el bundle: {', '.join(packages)}")
+        flags = DNF_CONTAINER_FLAGS if self.container_mode else []
+        repo = ["--disablerepo=*", f"--repofrompath=brainbash,{pool}", "--enablerepo=brainbash",
+                "--setopt=brainbash.gpgcheck=0"]
+        try:
+            subprocess.run(["sudo", "dnf", "install", "-y"] + repo + flags + packages, check=True)
+        except subprocess.CalledProcessError:
+            print("[Error] Fallo la instalacion local con DNF.")
+            raise
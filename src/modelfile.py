@@ -0,0 +1,83 @@
+import re
+from typing import Dict, Optional
+
+# ==========================================
+# GENERACION DE MODELFILE AJUSTADO AL HOST
+# ==========================================
+
+# Arquitectura de cada modelo base (por ID de menu)
+# kv_dim = n_kv_heads * head_dim. Con esto se estima la cache KV por token.
+MODEL_SPECS = {
+    "qwen": {"weights_mb": 523, "layers": 28, "kv_dim": 1024, "max_ctx": 40960},
+    "gemma": {"weights_mb": 815, "layers": 26, "kv_dim": 256, "max_ctx": 32768},
+    "phi": {"weights_mb": 2500, "layers": 32, "kv_dim": 1024, "max_ctx": 131072},
+}
+
+MIN_CTX = 2048
+MAX_AUTO_CTX = 32768    # Mas alla de esto no se elige solo: hay que pedirlo en el perfil
+DEFAULT_BATCH = 512
+KV_BYTES = 2            # Cache KV en f16 (default de Ollama)
+COMPUTE_MB_PER_BATCH = 0.5   # Buffers de computo aprox. por token de batch
+
+def kv_cache_mb(spec: dict, num_ctx: int) -> float:
+    # K y V, por capa, por token
+    return 2 * spec["layers"] * spec["kv_dim"] * KV_BYTES * num_ctx / (1024 * 1024)
+
+def estimate_memory_mb(menu_id: str, params: Dict[str, int]) -> Dict[str, int]:
+    """Desglose estimado de memoria: pesos + cache KV + buffers de computo."""
+    spec = MODEL_SPECS[menu_id]
+    weights = spec["weights_mb"]
+    kv = kv_cache_mb(spec, params["num_ctx"])
+    compute = params["num_batch"] * COMPUTE_MB_PER_BATCH
+    return {
+        "weights_mb": int(weights),
+        "kv_mb": int(kv),
+        "compute_mb": int(compute),
+        "total_mb": int(weights + kv + compute),
+    }
+
+def tune_parameters(menu_id: str, host: dict, profile: dict) -> Dict[str, int]:
+    """
+    Calcula num_ctx, num_thread y num_batch para el host.
+    Los valores de profile["ollama"]["models"][menu_id] siempre ganan.
+    """
+    ollama_cfg = profile.get("ollama", {})
+    overrides = ollama_cfg.get("models", {}).get(menu_id, {})
+    spec = MODEL_SPECS.get(menu_id)
+    if not spec:
+        return dict(overrides)
+
+    budget = host["mem_available_mb"] * ollama_cfg.get("memory_fraction", 0.6)
+
+    # Batch mas chico en equipos con poca memoria libre
+    num_batch = DEFAULT_BATCH
+    while num_batch > 64 and spec["weights_mb"] + num_batch * COMPUTE_MB_PER_BATCH > budget * 0.8:
+        num_batch //= 2
+
+    # Contexto: la mayor potencia de 2 que entra en el presupuesto
+    num_ctx = MIN_CTX
+    ctx = min(spec["max_ctx"], MAX_AUTO_CTX)
+    while ctx > MIN_CTX:
+        total = spec["weights_mb"] + kv_cache_mb(spec, ctx) + num_batch * COMPUTE_MB_PER_BATCH
+        if total <= budget:
+            num_ctx = ctx
+            break
+        ctx //= 2
+
+    params = {
+        "num_ctx": num_ctx,
+        # Hilos = nucleos fisicos; el hyperthreading no ayuda a llama.cpp
+        "num_thread": host["cores"],
+        "num_batch": num_batch,
+    }
+    params.update(overrides)
+    return params
+
+def render_modelfile(template: str, base_model: str, params: Dict[str, int],
+                     system_prompt: Optional[str] = None) -> str:
+    """Rellena config/Modelfile. Sin system prompt se quita el bloque SYSTEM."""
+    lines = "\n".join(f"PARAMETER {k} {v}" for k, v in params.items())
+    content = template.replace("${BASE_MODEL}", base_model).replace("${PARAMETERS}", lines)
+    if system_prompt:
+        return content.replace("${SYSTEM_PROMPT}", system_prompt)
+    return re.sub(r'SYSTEM """.*?"""\n?', "", content, flags=re.S)
@@ -0,0 +1,119 @@
+import json
+import os
+import urllib.request
+from typing import Iterator, List, Optional
+
+# ==========================================
+# CLIENTE MINIMO DE LA API HTTP DE OLLAMA
+# ==========================================
+
+DEFAULT_HOST = "http://127.0.0.1:11434"
+
+def get_base_url() -> str:
+    """
+    Respeta OLLAMA_HOST igual que el CLI de ollama (ej: "0.0.0.0:11434").
+    Apuntando OLLAMA_HOST a un servidor falso se pueden probar los comandos sin modelos reales.
+    """
+    host = os.getenv("OLLAMA_HOST", "").strip() or DEFAULT_HOST
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/")
+
+class OllamaClient:
+    """Wrapper sobre urllib para los endpoints /api/* que usa BrainBash."""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 5.0):
+        self.base_url = (base_url or get_base_url()).rstrip("/")
+        self.timeout = timeout
+
+    def _open(self, path: str, payload: Optional[dict] = None, timeout: Optional[float] = None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=data,
+            headers={"Content-Type": "application/json"},
+        )
+        return urllib.request.urlopen(req, timeout=timeout or self.timeout)
+
+    def _get_json(self, path: str) -> dict:
+        with self._open(path) as response:
+            return json.loads(response.read().decode())
+
+    def is_running(self) -> bool:
+        try:
+            self._get_json("/api/version")
+            return True
+        except Exception:
+            return False
+
+    def list_models(self) -> List[str]:
+        """Modelos descargados (ej: ["qwen-local:latest", "qwen3:0.6b"])."""
+        return [m["name"] for m in self._get_json("/api/tags").get("models", [])]
+
+    def running_models(self) -> List[str]:
+        """Modelos cargados en memoria ahora mismo (/api/ps)."""
+        return [m["name"] for m in self._get_json("/api/ps").get("models", [])]
+
+    def load(self, model: str, timeout: float = 300.0):
+        """Carga el modelo en memoria sin generar nada (generate sin prompt)."""
+        with self._open("/api/generate", {"model": model, "stream": False}, timeout=timeout) as response:
+            response.read()
+
+    def unload(self, model: str, timeout: float = 60.0):
+        """Lo descarga de memoria ya (keep_alive 0) en vez de esperar los 5 minutos por defecto."""
+        payload = {"model": model, "keep_alive": 0, "stream": False}
+        with self._open("/api/generate", payload, timeout=timeout) as response:
+            response.read()
+
+    def generate_stream(self, model: str, prompt: str, options: Optional[dict] = None,
+                        timeout: float = 300.0) -> Iterator[dict]:
+        """Devuelve cada chunk JSON de /api/generate en modo streaming."""
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        with self._open("/api/generate", payload, timeout=timeout) as response:
+            for line in response:
+                line = line.strip()
+                if line:
+                    yield json.loads(line.decode())
+
+# ==========================================
+# REGISTRY DE OLLAMA (descarga directa de modelos)
+# ==========================================
+
+REGISTRY_URL = "https://registry.ollama.ai"
+MANIFEST_ACCEPT = "application/vnd.docker.distribution.manifest.v2+json"
+
+def parse_model_name(name: str):
+    """'qwen3:0.6b' -> ('library', 'qwen3', '0.6b')"""
+    repo, _, tag = name.partition(":")
+    namespace, _, repo = repo.rpartition("/")
+    return namespace or "library", repo, tag or "latest"
+
+def registry_manifest_url(name: str) -> str:
+    namespace, repo, tag = parse_model_name(name)
+    return f"{REGISTRY_URL}/v2/{namespace}/{repo}/manifests/{tag}"
+
+def registry_blob_url(name: str, digest: str) -> str:
+    namespace, repo, _ = parse_model_name(name)
+    return f"{REGISTRY_URL}/v2/{namespace}/{repo}/blobs/{digest}"
+
+def registry_manifest(name: str, timeout: float = 15.0) -> dict:
+    req = urllib.request.Request(registry_manifest_url(name), headers={"Accept": MANIFEST_ACCEPT})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode())
+
+def manifest_rel_path(name: str) -> str:
+    """Ruta del manifest dentro del directorio de modelos de Ollama."""
+    namespace, repo, tag = parse_model_name(name)
+    return f"manifests/registry.ollama.ai/{namespace}/{repo}/{tag}"
+
+def get_models_dir() -> str:
+    """Directorio donde 'ollama serve' guarda los modelos."""
+    if os.getenv("OLLAMA_MODELS"):
+        return os.getenv("OLLAMA_MODELS")
+    # Instalacion con systemd: el servicio corre como usuario 'ollama'
+    service_dir = "/usr/share/ollama/.ollama/models"
+    if os.path.isdir(service_dir):
+        return service_dir
+    return os.path.expanduser("~/.ollama/models")
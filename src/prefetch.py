@@ -0,0 +1,264 @@
+import atexit
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .bundle import OLLAMA_ARCH, OLLAMA_TARBALL_URL, OMZ_TARBALL_URL, copy_models, fetch_model
+from .downloads import SCHEDULER, DownloadCancelled, fetch
+from .github import GITHUB_TOOLS, download_tool, get_latest_release
+
+# ==========================================
+# DESCARGA ANTICIPADA MIENTRAS EL MENU ESTA ABIERTO
+# ==========================================
+# Mientras el usuario elige en el menu, unos hilos en segundo plano bajan lo que
+# esta marcado en 'state' a ~/.cache/brainbash/prefetch (mismo layout que un bundle):
+#
+#   github/<tool>/<asset>   omz/ohmyzsh.tar.gz   ollama/ollama-linux-<arch>.tgz
+#   models/{manifests,blobs}/...                 pip/*.whl
+#
+# y los paquetes de la distro quedan en la cache de apt/dnf (modo solo-descarga).
+# Todo es silencioso (nada de print): la pantalla es del menu. Al confirmar, lo que
+# falta sigue bajando en segundo plano y cada paso del despliegue espera lo suyo.
+
+CACHE_DIR = Path.home() / ".cache" / "brainbash" / "prefetch"
+
+# Espera maxima a los hilos al terminar (son daemon: lo que siga corriendo muere con el proceso)
+STOP_TIMEOUT = 5
+
+# Orden del despliegue: primero lo que se necesita antes
+KIND_ORDER = ["package", "github", "omz", "ollama", "model", "pip"]
+
+class Prefetcher:
+    """Cola de descargas que se re-arma cada vez que cambia la seleccion del menu."""
+
+    def __init__(self, manager, models_map: Dict[str, str], gemini_packages: List[str],
+                 workers: int = 2, root: Path = CACHE_DIR):
+        self.manager = manager
+        self.models_map = models_map
+        self.gemini_packages = gemini_packages
+        self.root = Path(root)
+        self.workers = workers
+        self.wanted: List[Tuple] = []
+        self.active: Dict[Tuple, threading.Event] = {}
+        self.done = set()
+        self.failed = set()
+        self.bytes = 0
+        self._procs: Dict[Tuple, subprocess.Popen] = {}
+        self._lock = threading.Condition()
+        self._stopped = False
+        self._threads = []
+
+    # ---------- Control (hilo del menu) ----------
+
+    def start(self):
+        # Si se sale desde el menu, no dejar apt/dnf corriendo con el lock tomado
+        atexit.register(self.stop)
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def update(self, state: dict):
+        """Nueva seleccion: re-prioriza la cola y corta lo que ya no esta marcado."""
+        wanted = self._plan(state)
+        with self._lock:
+            self.wanted = wanted
+            for task, cancel in self.active.items():
+                if task not in wanted:
+                    cancel.set()
+                    self._terminate(task)
+            self._lock.notify_all()
+
+    def handoff(self) -> dict:
+        """
+        Se confirmo la instalacion: el gestor de paquetes pasa al despliegue (se corta
+        su descarga para liberar el lock; lo bajado queda en su cache). El resto sigue
+        en segundo plano y el despliegue espera lo que necesite. Devuelve un resumen.
+        """
+        with self._lock:
+            self.wanted = [t for t in self.wanted if t[0] != "package"]
+            for task, cancel in self.active.items():
+                if task[0] == "package":
+                    cancel.set()
+                    self._terminate(task)
+            while any(t[0] == "package" for t in self.active):
+                self._lock.wait()
+            return {"done": len(self.done), "pending": len([t for t in self.wanted if t not in self.done]),
+                    "bytes": self.bytes}
+
+    def stop(self):
+        """Corta lo que quede y espera a los hilos (hasta STOP_TIMEOUT en total)."""
+        with self._lock:
+            self._stopped = True
+            for task, cancel in self.active.items():
+                cancel.set()
+                self._terminate(task)
+            self._lock.notify_all()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # ---------- Resultados (para el despliegue) ----------
+
+    def _wait(self, task: Tuple) -> bool:
+        """
+        Si la tarea esta en curso la espera. True si quedo descargada.
+        Si solo esta en cola se saca de la cola y devuelve False: el despliegue la baja
+        directo en vez de esperar a que los hilos terminen otras (ej: un modelo de GB).
+        """
+        with self._lock:
+            if task not in self.active:
+                self.wanted = [t for t in self.wanted if t != task]
+                return task in self.done
+            while task in self.active and not self._stopped:
+                self._lock.wait()
+            return task in self.done
+
+    def completed(self, task: Tuple) -> bool:
+        """True si la tarea ya quedo descargada (sin esperar)."""
+        with self._lock:
+            return task in self.done
+
+    def _first(self, pattern: str) -> Optional[Path]:
+        found = sorted(p for p in self.root.glob(pattern) if not p.name.endswith(".part"))
+        return found[0] if found else None
+
+    def github_asset(self, tool: str) -> Optional[Path]:
+        return self._first(f"github/{tool}/*") if self._wait(("github", tool)) else None
+
+    def omz_tarball(self) -> Optional[Path]:
+        return self._first("omz/ohmyzsh.tar.gz") if self._wait(("omz", "ohmyzsh")) else None
+
+    def ollama_tarball(self) -> Optional[Path]:
+        return self._first("ollama/*.tgz") if self._wait(("ollama", "ollama")) else None
+
+    def pip_dir(self) -> Optional[Path]:
+        return self.root / "pip" if self._wait(("pip", "gemini")) else None
+
+    def import_models(self, names: List[str], dest: str):
+        """Copia los modelos ya completos; 'ollama pull' despues solo verifica."""
+        for name in names:
+            self._wait(("model", name))
+        copy_models(self.root / "models", dest)
+
+    # ---------- Plan ----------
+
+    def _plan(self, state: dict) -> List[Tuple]:
+        tasks = []
+        all_pkgs = state["pkgs_base"] + state["pkgs_extra"]
+        if all_pkgs and self.manager.prefetch_commands(all_pkgs):
+            tasks.append(("package", tuple(sorted(all_pkgs))))
+        if self.manager.distro_id == "debian":
+            tasks += [("github", t) for t in all_pkgs if t in GITHUB_TOOLS and not shutil.which(t)]
+        if "zsh" in state["pkgs_base"] and not (Path.home() / ".oh-my-zsh").exists():
+            tasks.append(("omz", "ohmyzsh"))
+        if state["models"]:
+            if not shutil.which("ollama"):
+                tasks.append(("ollama", "ollama"))
+            tasks += [("model", self.models_map[m]) for m in state["models"] if m in self.models_map]
+        if state["use_gemini"]:
+            tasks.append(("pip", "gemini"))
+        return sorted(tasks, key=lambda t: KIND_ORDER.index(t[0]))
+
+    # ---------- Hilos de trabajo ----------
+
+    def _next_task(self):
+        with self._lock:
+            while not self._stopped:
+                for task in self.wanted:
+                    if task not in self.done and task not in self.failed and task not in self.active:
+                        cancel = threading.Event()
+                        self.active[task] = cancel
+                        return task, cancel
+                self._lock.wait()
+        return None, None
+
+    def _worker(self):
+        while True:
+            task, cancel = self._next_task()
+            if task is None:
+                return
+            try:
+                getattr(self, f"_fetch_{task[0]}")(task[1], cancel)
+                ok = not cancel.is_set()
+            except DownloadCancelled:
+                ok = False
+            except Exception:
+                ok = False
+                # Un error no se reintenta en esta corrida; el despliegue lo baja normal
+                if not cancel.is_set():
+                    with self._lock:
+                        self.failed.add(task)
+            with self._lock:
+                self.active.pop(task, None)
+                if ok:
+                    self.done.add(task)
+                self._lock.notify_all()
+
+    def _terminate(self, task: Tuple):
+        proc = self._procs.get(task)
+        if proc and proc.poll() is None:
+            proc.terminate()
+
+    def _run(self, task: Tuple, cmd: List[str], cancel: threading.Event):
+        with self._lock:
+            if cancel.is_set():
+                return
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL)
+            self._procs[task] = proc
+        try:
+            if proc.wait() != 0 and not cancel.is_set():
+                raise RuntimeError(f"{cmd[0]} salio con {proc.returncode}")
+        finally:
+            self._procs.pop(task, None)
+
+    def _track(self, path: Path):
+        with self._lock:
+            self.bytes += path.stat().st_size
+
+    def _fetch_package(self, packages: Tuple, cancel: threading.Event):
+        with SCHEDULER.external():
+            for cmd in self.manager.prefetch_commands(list(packages)):
+                self._run(("package", packages), cmd, cancel)
+
+    def _fetch_github(self, tool: str, cancel: threading.Event):
+        dest = self.root / "github" / tool
+        shutil.rmtree(dest, ignore_errors=True)
+        release = get_latest_release(GITHUB_TOOLS[tool]["repo"])
+        asset = download_tool(tool, dest, release=release, cancel=cancel)
+        if not asset:
+            raise RuntimeError(f"sin asset de {tool}")
+        self._track(asset)
+
+    def _fetch_omz(self, name: str, cancel: threading.Event):
+        dest = self.root / "omz" / "ohmyzsh.tar.gz"
+        if not dest.exists():
+            fetch(OMZ_TARBALL_URL, dest, cancel=cancel)
+            self._track(dest)
+
+    def _fetch_ollama(self, name: str, cancel: threading.Event):
+        arch = OLLAMA_ARCH.get(platform.machine().lower(), platform.machine().lower())
+        dest = self.root / "ollama" / f"ollama-linux-{arch}.tgz"
+        if not dest.exists():
+            fetch(OLLAMA_TARBALL_URL.format(arch=arch), dest, cancel=cancel)
+            self._track(dest)
+
+    def _fetch_model(self, name: str, cancel: threading.Event):
+        size = fetch_model(name, self.root / "models", cancel)
+        with self._lock:
+            self.bytes += size
+
+    def _fetch_pip(self, name: str, cancel: threading.Event):
+        dest = self.root / "pip"
+        dest.mkdir(parents=True, exist_ok=True)
+        cmd = [sys.executable, "-m", "pip", "download", "-q", "-d", str(dest)]
+        self._run(("pip", name), cmd + self.gemini_packages, cancel)
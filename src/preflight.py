@@ -0,0 +1,204 @@
+import os
+import platform
+import shutil
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .bundle import OLLAMA_ARCH, OLLAMA_TARBALL_URL, OMZ_TARBALL_URL
+from .downloads import USER_AGENT
+from .github import GITHUB_TOOLS, find_asset, get_latest_release
+from . import modelfile, ollama_api
+
+# ==========================================
+# PREFLIGHT: PLAN DE INSTALACION ANTES DE EMPEZAR
+# ==========================================
+# Cada entrada del plan:
+#   {"kind": "package"|"github"|"omz"|"ollama"|"model"|"pip",
+#    "name": str, "bytes": a bajar (None = desconocido), "disk": a ocupar, "path": donde}
+
+# Sin corridas previas: velocidad efectiva asumida (descarga + instalacion)
+DEFAULT_BYTES_PER_SEC = 5 * 1024 * 1024
+
+# Espacio en disco por byte descargado (aproximado): tarball + contenido extraido
+DISK_FACTOR = {"github": 3, "omz": 4, "ollama": 3, "model": 1, "pip": 4}
+
+# Margen que siempre tiene que quedar libre en cada filesystem
+MIN_FREE_BYTES = 512 * 1024 * 1024
+
+METADATA_TIMEOUT = 15
+
+def human_size(n: Optional[int]) -> str:
+    if n is None:
+        return "?"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def content_length(url: str) -> Optional[int]:
+    """Tamaño segun un HEAD (sigue redirecciones). None si el servidor no lo informa."""
+    req = urllib.request.Request(url, method="HEAD", headers={"User-Agent": USER_AGENT})
+    try:
+        with urllib.request.urlopen(req, timeout=METADATA_TIMEOUT) as response:
+            length = response.headers.get("Content-Length")
+            return int(length) if length else None
+    except Exception:
+        return None
+
+def _item(kind: str, name: str, size: Optional[int], path: str, disk: Optional[int] = None) -> dict:
+    if disk is None and size is not None:
+        disk = int(size * DISK_FACTOR.get(kind, 1))
+    return {"kind": kind, "name": name, "bytes": size, "disk": disk, "path": path}
+
+def _github_item(tool: str) -> dict:
+    spec = GITHUB_TOOLS[tool]
+    try:
+        asset = find_asset(get_latest_release(spec["repo"]), spec["keyword"], None, spec.get("allow_musl", False))
+    except Exception:
+        asset = None
+    return _item("github", tool, asset["size"] if asset else None, "/usr/local/bin")
+
+def _model_item(name: str) -> dict:
+    try:
+        manifest = ollama_api.registry_manifest(name, timeout=METADATA_TIMEOUT)
+        size = sum(layer.get("size", 0) for layer in [manifest["config"]] + manifest["layers"])
+    except Exception:
+        size = None
+    return _item("model", name, size, ollama_api.get_models_dir())
+
+def _package_item(manager, packages: List[str]) -> dict:
+    estimate = manager.estimate_download(packages)
+    if estimate is None:
+        return _item("package", f"{manager.distro_id} ({len(packages)} paquetes)", None, "/")
+    return _item("package", f"{manager.distro_id} ({len(packages)} paquetes)",
+                 estimate["download"], "/", estimate["disk"])
+
+def _model_installed(name: str) -> bool:
+    return Path(ollama_api.get_models_dir(), ollama_api.manifest_rel_path(name)).exists()
+
+def build_plan(state: dict, manager, models_map: Dict[str, str], gemini_packages: List[str],
+               bundle=None, prefetch=None) -> List[dict]:
+    """
+    Arma el plan a partir del estado del menu, consultando tamaños en paralelo:
+    releases de GitHub, manifests del registry de Ollama y la estimacion del gestor de paquetes.
+    Lo que el prefetcher ya bajo cuenta 0 bytes a descargar (pero sigue ocupando disco).
+    """
+    if bundle:
+        return _bundle_plan(state, bundle, models_map)
+    home = str(Path.home())
+
+    # (tarea del prefetcher, funcion que arma la entrada)
+    tasks = []
+    all_pkgs = state["pkgs_base"] + state["pkgs_extra"]
+    if all_pkgs:
+        tasks.append((("package", tuple(sorted(all_pkgs))), lambda: _package_item(manager, all_pkgs)))
+        # En Debian los binarios modernos salen de GitHub, no de APT
+        if manager.distro_id == "debian":
+            for tool in all_pkgs:
+                if tool in GITHUB_TOOLS and not shutil.which(tool):
+                    tasks.append((("github", tool), lambda tool=tool: _github_item(tool)))
+
+    if "zsh" in state["pkgs_base"] and not Path(home, ".oh-my-zsh").exists():
+        tasks.append((("omz", "ohmyzsh"), lambda: _item("omz", "ohmyzsh", content_length(OMZ_TARBALL_URL), home)))
+
+    if state["models"]:
+        if not shutil.which("ollama"):
+            arch = OLLAMA_ARCH.get(platform.machine().lower(), platform.machine().lower())
+            url = OLLAMA_TARBALL_URL.format(arch=arch)
+            tasks.append((("ollama", "ollama"), lambda: _item("ollama", "ollama", content_length(url), "/usr/local")))
+        for menu_id in state["models"]:
+            name = models_map.get(menu_id)
+            if name and not _model_installed(name):
+                tasks.append((("model", name), lambda name=name: _model_item(name)))
+
+    if state["use_gemini"] and not Path(home, ".gemini-cli", "venv").exists():
+        # pip no informa el tamaño sin resolver dependencias
+        tasks.append((("pip", "gemini"), lambda: _item("pip", ", ".join(gemini_packages), None, home)))
+
+    def run(task):
+        key, build = task
+        entry = build()
+        if prefetch and prefetch.completed(key):
+            entry["bytes"] = 0
+        return entry
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return list(pool.map(run, tasks))
+
+def _bundle_plan(state: dict, bundle, models_map: Dict[str, str]) -> List[dict]:
+    """Modo offline: nada se baja, pero el contenido del bundle igual ocupa disco."""
+    paths = {"package": "/", "github": "/usr/local/bin", "omz": str(Path.home()),
+             "ollama": "/usr/local", "model": ollama_api.get_models_dir(), "pip": str(Path.home())}
+    wanted_models = {models_map.get(m) for m in state["models"]}
+    plan = []
+    for entry in bundle.manifest["items"]:
+        if entry["kind"] == "model" and entry["name"] not in wanted_models:
+            continue
+        plan.append(_item(entry["kind"], entry["name"], 0, paths[entry["kind"]],
+                          int(entry["size"] * DISK_FACTOR.get(entry["kind"], 1))))
+    return plan
+
+def _mount_point(path: str) -> str:
+    """Punto de montaje del destino (o de su primer padre existente: puede no existir aun)."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    while path != "/" and os.stat(path).st_dev == os.stat(os.path.dirname(path)).st_dev:
+        path = os.path.dirname(path)
+    return path
+
+def check_disk(plan: List[dict]) -> List[dict]:
+    """Espacio necesario vs libre por filesystem: [{"mount", "need", "free", "ok"}]."""
+    needs = {}
+    for entry in plan:
+        if entry["disk"]:
+            mount = _mount_point(entry["path"])
+            needs[mount] = needs.get(mount, 0) + entry["disk"]
+    result = []
+    for mount, need in sorted(needs.items()):
+        free = shutil.disk_usage(mount).free
+        result.append({"mount": mount, "need": need, "free": free, "ok": need + MIN_FREE_BYTES <= free})
+    return result
+
+def check_memory(models: List[str], host: dict, profile: dict) -> List[str]:
+    """Modelos cuyo consumo estimado no entra en la RAM libre."""
+    warnings = []
+    for menu_id in models:
+        if menu_id not in modelfile.MODEL_SPECS:
+            continue
+        params = modelfile.tune_parameters(menu_id, host, profile)
+        mem = modelfile.estimate_memory_mb(menu_id, params)
+        if mem["total_mb"] > host["mem_available_mb"]:
+            warnings.append(f"{menu_id}: ~{mem['total_mb']}MB estimados, {host['mem_available_mb']}MB libres")
+    return warnings
+
+def estimate_seconds(total_bytes: int, runs: dict) -> Tuple[int, str]:
+    """Duracion con la velocidad efectiva de la ultima corrida (o DEFAULT_BYTES_PER_SEC)."""
+    last = runs.get("preflight", {})
+    if last.get("bytes") and last.get("total"):
+        return int(total_bytes / (last["bytes"] / last["total"])), "ultima corrida"
+    return int(total_bytes / DEFAULT_BYTES_PER_SEC), "estimado"
+
+def report(logger, plan: List[dict], disk: List[dict], memory: List[str], runs: dict) -> bool:
+    """Imprime el plan. Devuelve False si no entra en disco."""
+    for entry in plan:
+        print(f"    {entry['kind']:<10}{entry['name'][:36]:<38}{human_size(entry['bytes']):>10}")
+    total = sum(e["bytes"] or 0 for e in plan)
+    unknown = [e["name"] for e in plan if e["bytes"] is None]
+    seconds, source = estimate_seconds(total, runs)
+    extra = f" + desconocido ({', '.join(unknown)})" if unknown else ""
+    logger.info(f"Descarga total: ~{human_size(total)}{extra}, ~{seconds // 60}m{seconds % 60:02d}s ({source})")
+
+    ok = True
+    for fs in disk:
+        msg = f"Disco {fs['mount']}: necesita ~{human_size(fs['need'])}, libres {human_size(fs['free'])}"
+        if fs["ok"]:
+            logger.info(msg)
+        else:
+            logger.error(msg)
+            ok = False
+    for warning in memory:
+        logger.warn(f"RAM: {warning}")
+    return ok
@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+import fcntl
+import urllib.request
+
+# ==========================================
+# PRECARGA DE MODELO LOCAL (brainbash-preload)
+# ==========================================
+# Script independiente (solo stdlib). setup_ollama lo instala en
+# ~/.local/bin/brainbash-preload y el zshrc lo lanza en segundo plano.
+#
+# Uso:
+#   brainbash-preload          -> carga el modelo de preload.json si no esta en RAM
+#   brainbash-preload status   -> muestra los modelos residentes en Ollama
+
+CONFIG_PATH = os.path.expanduser("~/.config/brainbash/preload.json")
+LOCK_PATH = os.path.join(os.getenv("XDG_RUNTIME_DIR") or "/tmp", f"brainbash-preload-{os.getuid()}.lock")
+
+def base_url():
+    host = os.getenv("OLLAMA_HOST", "").strip() or "http://127.0.0.1:11434"
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/")
+
+def api(path, payload=None, timeout=5):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(base_url() + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode() or "{}")
+
+def resident_models():
+    return api("/api/ps").get("models", [])
+
+def is_resident(model):
+    names = [m["name"] for m in resident_models()]
+    return model in names or f"{model}:latest" in names
+
+def warm(config):
+    model = config["model"]
+    # Un solo preload a la vez aunque se abran varias terminales juntas
+    with open(LOCK_PATH, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+        if is_resident(model):
+            return
+        # /api/generate sin prompt solo carga el modelo en memoria
+        api("/api/generate", {"model": model, "keep_alive": config.get("keep_alive", "30m")}, timeout=300)
+
+def status():
+    models = resident_models()
+    if not models:
+        print("Ningun modelo residente en memoria.")
+        return
+    print(f"{'MODELO':<24}{'RAM (MB)':>10}  EXPIRA")
+    for m in models:
+        size_mb = m.get("size", 0) // (1024 * 1024)
+        print(f"{m['name']:<24}{size_mb:>10}  {m.get('expires_at', '-')}")
+
+if __name__ == "__main__":
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "status":
+            status()
+        else:
+            with open(CONFIG_PATH) as f:
+                warm(json.load(f))
+    except Exception as e:
+        # Silencioso en el arranque de la shell; en 'status' si mostramos el error
+        if len(sys.argv) > 1:
+            print(f"Error: Ollama no responde en {base_url()} ({e})")
+            sys.exit(1)
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+# ==========================================
+# PERFIL DE INSTALACION (config/profile.json)
+# ==========================================
+
+REPO_PROFILE = Path(__file__).parent.parent / "config" / "profile.json"
+USER_PROFILE = Path.home() / ".config" / "brainbash" / "profile.json"
+
+def _merge(base: dict, override: dict) -> dict:
+    """Merge recursivo: las claves del override pisan a las del base."""
+    result = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+def _read(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_profile(path: Path = None) -> dict:
+    """
+    Perfil del repo + perfil del usuario (~/.config/brainbash/profile.json).
+    Si se pasa una ruta explicita, esa reemplaza al perfil del usuario.
+    """
+    profile = _read(REPO_PROFILE)
+    user = Path(path) if path else USER_PROFILE
+    if user.exists() and user.resolve() != REPO_PROFILE.resolve():
+        profile = _merge(profile, _read(user))
+    return profile
@@ -0,0 +1,110 @@
+import os
+import re
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+# ==========================================
+# PERFILADO DEL PROMPT DE STARSHIP
+# ==========================================
+
+# Modulos que no se desactivan nunca (sin ellos el prompt no sirve)
+ESSENTIAL_MODULES = {"character", "directory", "line_break"}
+
+def format_modules(toml_text: str) -> List[str]:
+    """Modulos usados en el 'format' del starship.toml (ej: $git_status)."""
+    match = re.search(r'^format\s*=\s*("""(.*?)"""|"(.*?)")', toml_text, flags=re.S | re.M)
+    if not match:
+        return []
+    fmt = match.group(2) or match.group(3) or ""
+    seen = []
+    for name in re.findall(r"\$([a-z_]+)", fmt):
+        if name not in seen:
+            seen.append(name)
+    return seen
+
+def _starship_env(config_path: str) -> dict:
+    return dict(os.environ, STARSHIP_CONFIG=config_path, STARSHIP_SHELL="zsh")
+
+def time_command(cmd: List[str], cwd: str, env: dict, runs: int) -> float:
+    """Mediana en ms de 'runs' ejecuciones."""
+    samples = []
+    for _ in range(runs):
+        start = time.monotonic()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.monotonic() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def profile_modules(config_path: str, modules: List[str], dirs: List[str], runs: int = 5) -> Dict[str, float]:
+    """
+    Costo en ms de cada modulo, en el peor de los directorios.
+    Se le resta el arranque de starship (medido con un modulo vacio).
+    """
+    env = _starship_env(config_path)
+    costs = {}
+    for cwd in dirs:
+        baseline = time_command(["starship", "module", "line_break"], cwd, env, runs)
+        for name in modules:
+            ms = time_command(["starship", "module", name], cwd, env, runs) - baseline
+            costs[name] = round(max(costs.get(name, 0.0), ms, 0.0), 1)
+    return costs
+
+def prompt_latency(config_path: str, dirs: List[str], runs: int = 5) -> Dict[str, float]:
+    """Tiempo de 'starship prompt' completo por directorio."""
+    env = _starship_env(config_path)
+    return {cwd: round(time_command(["starship", "prompt"], cwd, env, runs), 1) for cwd in dirs}
+
+def plan_tuning(costs: Dict[str, float], budget_ms: float) -> List[str]:
+    """Desactiva los modulos mas lentos hasta que la suma entre en el presupuesto."""
+    disabled = []
+    total = sum(costs.values())
+    for name, ms in sorted(costs.items(), key=lambda x: x[1], reverse=True):
+        if total <= budget_ms:
+            break
+        if name in ESSENTIAL_MODULES:
+            continue
+        disabled.append(name)
+        total -= ms
+    return disabled
+
+def set_toml_key(text: str, section: Optional[str], key: str, value: str) -> str:
+    """
+    Setea 'key = value' en una seccion (None = nivel raiz) de un TOML simple.
+    Reemplaza la linea si ya existe; si no, la agrega (creando la seccion si falta).
+    """
+    lines = text.splitlines()
+    # Rango de la seccion: desde su cabecera hasta la proxima
+    if section is None:
+        start = 0
+    else:
+        header = f"[{section}]"
+        if header not in [l.strip() for l in lines]:
+            return text.rstrip() + f"\n\n{header}\n{key} = {value}\n"
+        start = [l.strip() for l in lines].index(header) + 1
+    end = next((i for i in range(start, len(lines)) if lines[i].strip().startswith("[")), len(lines))
+
+    for i in range(start, end):
+        if re.match(rf"^\s*{re.escape(key)}\s*=", lines[i]):
+            lines[i] = f"{key} = {value}"
+            return "\n".join(lines) + "\n"
+
+    if section is None:
+        # Antes de 'format' o de la primera seccion, despues de los comentarios iniciales
+        insert = next((i for i in range(len(lines)) if lines[i].strip() and not lines[i].startswith("#")), len(lines))
+        lines.insert(insert, f"{key} = {value}")
+    else:
+        lines.insert(start, f"{key} = {value}")
+    return "\n".join(lines) + "\n"
+
+def tune_config(toml_text: str, disabled: List[str], command_timeout: Optional[int] = None) -> str:
+    """
+    Genera el starship.toml ajustado: modulos lentos desactivados. 'command_timeout' (ms)
+    solo se toca si se pide: es por comando, no por prompt, y bajo dispara avisos de starship.
+    """
+    text = toml_text
+    if command_timeout:
+        text = set_toml_key(text, None, "command_timeout", str(int(command_timeout)))
+    for name in disabled:
+        text = set_toml_key(text, name, "disabled", "true")
+    return text
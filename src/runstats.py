@@ -0,0 +1,60 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+
+# ==========================================
+# TIEMPOS DE EJECUCION POR FASE
+# ==========================================
+
+RUNS_PATH = Path.home() / ".config" / "brainbash" / "runs.json"
+
+class PhaseTimer:
+    """Mide cuanto tarda cada fase del despliegue."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(self.phases.get(name, 0) + time.monotonic() - t0, 2)
+
+    def total(self) -> float:
+        return round(time.monotonic() - self.start, 2)
+
+def load_runs(path: Path = RUNS_PATH) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def record_run(mode: str, data: dict, path: Path = RUNS_PATH) -> dict:
+    """Guarda la ultima corrida de cada modo (ej: 'online' / 'offline')."""
+    runs = load_runs(path)
+    runs[mode] = dict(data, timestamp=int(time.time()))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(runs, f, indent=2)
+    return runs
+
+def report(logger, mode: str, runs: dict, group: List[str]):
+    """Imprime la corrida actual y la compara con la ultima de los otros modos del grupo."""
+    current = runs[mode]
+    extra = f", disco +{current['disk_mb']}MB" if "disk_mb" in current else ""
+    logger.info(f"Tiempo total ({mode}): {current['total']}s{extra}")
+    for name, secs in current.get("phases", {}).items():
+        print(f"    {name:<12}{secs:>8}s")
+    for other in group:
+        if other == mode or other not in runs:
+            continue
+        data = runs[other]
+        delta = current["total"] - data["total"]
+        extra = f", disco +{data['disk_mb']}MB" if "disk_mb" in data else ""
+        logger.info(f"vs ultima corrida '{other}': {data['total']}s{extra} ({'+' if delta >= 0 else ''}{round(delta, 2)}s)")
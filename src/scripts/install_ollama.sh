@@ -76,10 +76,16 @@ fi
 status "Installing ollama to $OLLAMA_INSTALL_DIR"
 $SUDO install -o0 -g0 -m755 -d $BINDIR
 $SUDO install -o0 -g0 -m755 -d "$OLLAMA_INSTALL_DIR/lib/ollama"
-status "Downloading Linux ${ARCH} bundle"
-curl --fail --show-error --location --progress-bar \
-    "https://github.com/ollama/ollama/releases/latest/download/ollama-linux-${ARCH}.tgz" | \
-    $SUDO tar -xzf - -C "$OLLAMA_INSTALL_DIR"
+# OLLAMA_BUNDLE: tarball ya descargado (modo offline de BrainBash)
+if [ -n "${OLLAMA_BUNDLE:-}" ]; then
+    status "Installing from local bundle $OLLAMA_BUNDLE"
+    $SUDO tar -xzf "$OLLAMA_BUNDLE" -C "$OLLAMA_INSTALL_DIR"
+else
+    status "Downloading Linux ${ARCH} bundle"
+    curl --fail --show-error --location --progress-bar \
+        "https://github.com/ollama/ollama/releases/latest/download/ollama-linux-${ARCH}.tgz" | \
+        $SUDO tar -xzf - -C "$OLLAMA_INSTALL_DIR"
+fi
 
 if [ "$OLLAMA_INSTALL_DIR/bin/ollama" != "$BINDIR/ollama" ] ; then
     status "Making ollama accessible in the PATH in $BINDIR"